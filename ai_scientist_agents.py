@@ -5,12 +5,92 @@ This module defines AI Scientist agents that conduct research through
 GitHub PR/review workflow, inheriting from AgentLaboratory's BaseAgent structure.
 """
 
+import io
+import types
+import asyncio
+import hashlib
+import functools
+import collections
 from typing import Dict, List, Optional, Tuple
 from agents import BaseAgent
-from gemini_inference import query_model_gemini
+from gemini_inference import (
+    query_model_gemini,
+    query_model_gemini_async,
+    extract_json,
+    json_object_complete,
+)
 from tools import ArxivSearch, execute_code
 from utils import extract_prompt
-import copy
+
+
+# Number of recent reviews kept in the memory cache
+MEMORY_REVIEW_K = 3
+
+# Stage -> (attribute holding the raw output, memory cache slot for its summary)
+_STAGE_MEMORY = {
+    "theme_decision": (None, None),
+    "hypothesis": ("hypothesis", "hypothesis_summary"),
+    "experiment_plan": ("experiment_plan", "plan_summary"),
+    "experiment_implementation": ("experiment_code", "implementation_summary"),
+    "results_interpretation": ("interpretation", "latest_results_digest"),
+    "paper_writing": ("paper", None)
+}
+
+# Phase -> (memory cache slot, label) of earlier stage summaries it builds on
+_PHASE_DEPS = {
+    "experiment_plan": (
+        ("hypothesis_summary", "あなたの仮説"),
+    ),
+    "experiment_implementation": (
+        ("hypothesis_summary", "あなたの仮説"),
+        ("plan_summary", "あなたの実験計画"),
+    ),
+    "results_interpretation": (
+        ("hypothesis_summary", "あなたの仮説"),
+        ("plan_summary", "あなたの実験計画"),
+        ("implementation_summary", "あなたの実験コード"),
+    ),
+    "paper_writing": (
+        ("hypothesis_summary", "あなたの仮説"),
+        ("plan_summary", "あなたの実験計画"),
+        ("implementation_summary", "あなたの実験コード"),
+        ("latest_results_digest", "あなたの結果解釈"),
+    ),
+}
+
+# Task instruction for each research phase (read-only, shared by all agents)
+_PHASE_PROMPTS = types.MappingProxyType({
+    "theme_decision": "大枠の研究テーマから、具体的で実行可能な研究テーマを決定してください。",
+    "hypothesis": "研究テーマに基づいて、検証可能な仮説を提案してください。",
+    "experiment_plan": "仮説を検証するための実験計画を立案してください。",
+    "experiment_implementation": "実験計画に基づいて、実験を実装してください。",
+    "results_interpretation": "実験結果を解釈し、仮説との関係を考察してください。",
+    "paper_writing": "研究全体をまとめた論文を執筆してください。"
+})
+
+
+class _SharedArxivSearch(ArxivSearch):
+    """
+    ArxivSearch whose successful results are memoized, so overlapping
+    searches from different scientists are answered locally.
+    """
+    
+    @functools.lru_cache(maxsize=512)
+    def _find_papers_cached(self, query: str, N: int) -> str:
+        result = super().find_papers_by_str(query, N=N)
+        if result is None:
+            raise LookupError(query)  # Failed searches are not cached
+        return result
+    
+    def find_papers_by_str(self, query, N=20):
+        try:
+            return self._find_papers_cached(query, N)
+        except LookupError:
+            return None
+
+
+# One search client shared by every scientist (connection reuse, warm cache)
+_ARXIV_SEARCH = _SharedArxivSearch()
 
 
 class AIScientistAgent(BaseAgent):
@@ -19,6 +99,16 @@ class AIScientistAgent(BaseAgent):
     Inherits from AgentLaboratory's BaseAgent class.
     """
     
+    # Display names of the research stages, in phase order
+    stage_names = (
+        "研究テーマ決定",
+        "仮説提案",
+        "実験計画",
+        "実験構築",
+        "結果解釈",
+        "論文執筆"
+    )
+    
     def __init__(self, scientist_id: str, model: str = "gemini-2.0-flash-lite", notes: Optional[List] = None, 
                  max_steps: int = 100, gemini_api_key: Optional[str] = None):
         """
@@ -36,6 +126,12 @@ class AIScientistAgent(BaseAgent):
         self.scientist_id = scientist_id
         self.gemini_api_key = gemini_api_key
         
+        # Bounded history of (expire_at_step, entry); entries are stamped with
+        # the step they expire at instead of being decremented every step, and
+        # expired ones are pruned on append so they never evict live entries
+        self.history = collections.deque(maxlen=self.max_hist_len)
+        self._step_idx = 0
+        
         # Research stages
         self.phases = [
             "theme_decision",
@@ -47,14 +143,6 @@ class AIScientistAgent(BaseAgent):
         ]
         
         self.current_stage = 0
-        self.stage_names = [
-            "研究テーマ決定",
-            "仮説提案",
-            "実験計画",
-            "実験構築",
-            "結果解釈",
-            "論文執筆"
-        ]
         
         # Context storage (critical for maintaining history)
         self.research_theme = None  # Specific research theme
@@ -71,8 +159,27 @@ class AIScientistAgent(BaseAgent):
         self.interpretation = None
         self.paper = None
         
+        # Compact structured memory that context() reads from, so prompt size
+        # stays constant as history grows. Full outputs live in raw_artifacts
+        # and are only consulted on demand via seek_information().
+        self.memory_cache = {
+            "theme": None,
+            "hypothesis_summary": None,
+            "plan_summary": None,
+            "implementation_summary": None,
+            "latest_results_digest": None,
+            "reviews_received": [],
+            "reviews_given": [],
+            "citizen_summary": None
+        }
+        self.raw_artifacts = {}
+        
+        # Reviews keyed by a digest of (reviewer, stage, file contents), so
+        # re-reviewing identical content does not trigger a new LLM call
+        self._review_cache: Dict[str, Tuple[str, str, str]] = {}
+        
         # ArXiv search tool
-        self.arxiv_search = ArxivSearch()
+        self.arxiv_search = _ARXIV_SEARCH
     
     def inference(self, research_topic: str, phase: str, step: int, 
                  feedback: str = "", temp: Optional[float] = None) -> str:
@@ -93,8 +200,12 @@ class AIScientistAgent(BaseAgent):
 タスク指示: {self.phase_prompt(phase)}
 {self.command_descriptions(phase)}"""
         
+        self._step_idx += 1
         context = self.context(phase)
-        history_str = "\n".join([_[1] for _ in self.history])
+        history_str = "\n".join(
+            entry for expire_at, entry in self.history
+            if expire_at is None or expire_at >= self._step_idx
+        )
         phase_notes = [_note for _note in self.notes if phase in _note.get("phases", [])]
         notes_str = f"タスク目標に関するノート: {phase_notes}\n" if len(phase_notes) > 0 else ""
         
@@ -129,29 +240,28 @@ class AIScientistAgent(BaseAgent):
             steps_exp = int(feedback.split("\n")[0].replace("```EXPIRATION ", ""))
             feedback = extract_prompt(feedback, "EXPIRATION")
         
-        self.history.append((steps_exp, f"Step #{step}, Phase: {phase}, Feedback: {feedback}, Your response: {model_resp}"))
+        # Drop entries that will have expired by the next call
+        if any(item[0] is not None and item[0] <= self._step_idx for item in self.history):
+            self.history = collections.deque(
+                (item for item in self.history if item[0] is None or item[0] > self._step_idx),
+                maxlen=self.max_hist_len
+            )
         
-        # Remove expired histories
-        for _i in reversed(range(len(self.history))):
-            if self.history[_i][0] is not None:
-                self.history[_i] = (self.history[_i][0] - 1, self.history[_i][1])
-                if self.history[_i][0] < 0:
-                    self.history.pop(_i)
-        
-        if len(self.history) >= self.max_hist_len:
-            self.history.pop(0)
+        # An entry expiring in N steps stays visible for the next N calls
+        expire_at = self._step_idx + steps_exp if steps_exp is not None else None
+        self.history.append((expire_at, f"Step #{step}, Phase: {phase}, Feedback: {feedback}, Your response: {model_resp}"))
         
         return model_resp
     
-    def decide_research_theme(self, general_topic: str) -> str:
+    def _theme_prompts(self, general_topic: str) -> Tuple[str, str]:
         """
-        Decide on a specific research theme based on general topic.
+        Build the system prompt and user prompt for theme decision.
         
         Args:
             general_topic: General research topic provided
             
         Returns:
-            Specific research theme
+            Tuple of (sys_prompt, prompt)
         """
         sys_prompt = f"""あなたは{self.role_description()}
 AI研究の専門家として、与えられた大枠の研究テーマから、具体的で実行可能な研究テーマを決定してください。
@@ -173,6 +283,41 @@ AI研究の専門家として、与えられた大枠の研究テーマから、
 [具体的な研究テーマの記述]
 ```"""
         
+        return sys_prompt, prompt
+    
+    def _record_theme(self, response: str) -> str:
+        """
+        Extract the theme from the model response and store it.
+        
+        Args:
+            response: Model response
+            
+        Returns:
+            Specific research theme
+        """
+        # Extract theme
+        if "```THEME" in response:
+            theme = extract_prompt(response, "THEME")
+        else:
+            theme = response
+        
+        self.research_theme = theme
+        self.memory_cache["theme"] = theme
+        self.raw_artifacts["theme"] = theme
+        return theme
+    
+    def decide_research_theme(self, general_topic: str) -> str:
+        """
+        Decide on a specific research theme based on general topic.
+        
+        Args:
+            general_topic: General research topic provided
+            
+        Returns:
+            Specific research theme
+        """
+        sys_prompt, prompt = self._theme_prompts(general_topic)
+        
         response = query_model_gemini(
             model_str=self.model,
             system_prompt=sys_prompt,
@@ -182,24 +327,40 @@ AI研究の専門家として、与えられた大枠の研究テーマから、
             print_cost=False
         )
         
-        # Extract theme
-        if "```THEME" in response:
-            theme = extract_prompt(response, "THEME")
-        else:
-            theme = response
+        return self._record_theme(response)
+    
+    async def decide_research_theme_async(self, general_topic: str) -> str:
+        """
+        Async version of decide_research_theme.
         
-        self.research_theme = theme
-        return theme
+        Args:
+            general_topic: General research topic provided
+            
+        Returns:
+            Specific research theme
+        """
+        sys_prompt, prompt = self._theme_prompts(general_topic)
+        
+        response = await query_model_gemini_async(
+            model_str=self.model,
+            system_prompt=sys_prompt,
+            prompt=prompt,
+            gemini_api_key=self.gemini_api_key,
+            temp=0.8,
+            print_cost=False
+        )
+        
+        return self._record_theme(response)
     
-    def create_stage_output(self, stage: str) -> str:
+    def _stage_prompts(self, stage: str) -> Tuple[str, str]:
         """
-        Create output for a research stage.
+        Build the system prompt and user prompt for a research stage.
         
         Args:
             stage: Stage name
             
         Returns:
-            Stage output content
+            Tuple of (sys_prompt, prompt)
         """
         context = self.context(stage)
         
@@ -213,6 +374,23 @@ AI研究の専門家として、与えられた大枠の研究テーマから、
 上記のコンテキストに基づいて、{stage}の成果物を作成してください。
 成果物は詳細で具体的なものにしてください。"""
         
+        return sys_prompt, prompt
+    
+    def create_stage_output(self, stage: str) -> str:
+        """
+        Create output for a research stage.
+        
+        The output is recorded in the raw store; its memory cache summary is
+        only written by update_cache once the stage is accepted.
+        
+        Args:
+            stage: Stage name
+            
+        Returns:
+            Stage output content
+        """
+        sys_prompt, prompt = self._stage_prompts(stage)
+        
         response = query_model_gemini(
             model_str=self.model,
             system_prompt=sys_prompt,
@@ -222,19 +400,201 @@ AI研究の専門家として、与えられた大枠の研究テーマから、
             print_cost=False
         )
         
+        self._record_output(stage, response)
+        
         return response
     
-    def review_pr(self, pr_content: Dict, pr_author: str) -> Tuple[str, str, str]:
+    async def create_stage_output_async(self, stage: str) -> str:
         """
-        Review a pull request from the other scientist.
+        Async version of create_stage_output.
+        
+        Args:
+            stage: Stage name
+            
+        Returns:
+            Stage output content
+        """
+        sys_prompt, prompt = self._stage_prompts(stage)
+        
+        response = await query_model_gemini_async(
+            model_str=self.model,
+            system_prompt=sys_prompt,
+            prompt=prompt,
+            gemini_api_key=self.gemini_api_key,
+            temp=0.7,
+            print_cost=False
+        )
+        
+        self._record_output(stage, response)
+        
+        return response
+    
+    def _record_output(self, phase: str, output: str):
+        """
+        Record a stage output in the raw store and its stage attribute.
+        
+        Args:
+            phase: Stage name
+            output: Full stage output
+        """
+        self.raw_artifacts[phase] = output
+        
+        attr = _STAGE_MEMORY.get(phase, (None, None))[0]
+        if attr is not None:
+            setattr(self, attr, output)
+    
+    def update_cache(self, phase: str, output: str):
+        """
+        Record an accepted stage output and its summary in the memory cache.
+        
+        Args:
+            phase: Stage name
+            output: Full stage output
+        """
+        self._record_output(phase, output)
+        
+        slot = _STAGE_MEMORY.get(phase, (None, None))[1]
+        if slot is not None:
+            self.memory_cache[slot] = self._summarize(phase, output)
+    
+    async def update_cache_async(self, phase: str, output: str):
+        """
+        Async version of update_cache.
+        
+        Args:
+            phase: Stage name
+            output: Full stage output
+        """
+        self._record_output(phase, output)
+        
+        slot = _STAGE_MEMORY.get(phase, (None, None))[1]
+        if slot is not None:
+            self.memory_cache[slot] = await self._summarize_async(phase, output)
+    
+    def _summary_prompts(self, phase: str, text: str) -> Tuple[str, str]:
+        """
+        Build the (system prompt, prompt) pair for summarizing a stage output.
+        
+        Args:
+            phase: Stage name
+            text: Full stage output
+            
+        Returns:
+            Tuple of (system prompt, prompt)
+        """
+        label = self.stage_names[self.phases.index(phase)] if phase in self.phases else phase
+        
+        sys_prompt = f"""あなたは{self.role_description()}
+後続の研究ステップで参照するために、研究成果物を要約してください。"""
+        
+        prompt = f"""以下の{label}の成果物を、重要な結論・数値・手法を落とさずに150トークン以内で要約してください。
+
+{text}"""
+        
+        return sys_prompt, prompt
+    
+    def _summarize(self, phase: str, text: str) -> str:
+        """
+        Summarize a stage output into a short digest for the memory cache.
+        
+        Args:
+            phase: Stage name
+            text: Full stage output
+            
+        Returns:
+            Summary string (truncated text if summarization fails)
+        """
+        sys_prompt, prompt = self._summary_prompts(phase, text)
+        
+        try:
+            return query_model_gemini(
+                model_str=self.model,
+                system_prompt=sys_prompt,
+                prompt=prompt,
+                gemini_api_key=self.gemini_api_key,
+                temp=0.3,
+                max_tokens=300,
+                print_cost=False
+            )
+        except Exception:
+            return text[:200] + "..."
+    
+    async def _summarize_async(self, phase: str, text: str) -> str:
+        """
+        Async version of _summarize.
+        
+        Args:
+            phase: Stage name
+            text: Full stage output
+            
+        Returns:
+            Summary string (truncated text if summarization fails)
+        """
+        sys_prompt, prompt = self._summary_prompts(phase, text)
+        
+        try:
+            return await query_model_gemini_async(
+                model_str=self.model,
+                system_prompt=sys_prompt,
+                prompt=prompt,
+                gemini_api_key=self.gemini_api_key,
+                temp=0.3,
+                max_tokens=300,
+                print_cost=False
+            )
+        except Exception:
+            return text[:200] + "..."
+    
+    def seek_information(self, query: str) -> str:
+        """
+        Extract specific information from the full stage outputs on demand.
+        
+        Args:
+            query: What to look up (e.g., "実験で使用したデータセット")
+            
+        Returns:
+            Extracted information
+        """
+        if not self.raw_artifacts:
+            return "（参照できる成果物がありません）"
+        
+        artifacts = "\n\n".join(
+            f"=== {phase} ===\n{content}" for phase, content in self.raw_artifacts.items()
+        )
+        
+        sys_prompt = f"""あなたは{self.role_description()}
+これまでの研究成果物から、質問に関係する情報だけを抜き出して簡潔に答えてください。"""
+        
+        prompt = f"""質問: {query}
+
+研究成果物:
+{artifacts}"""
+        
+        return query_model_gemini(
+            model_str=self.model,
+            system_prompt=sys_prompt,
+            prompt=prompt,
+            gemini_api_key=self.gemini_api_key,
+            temp=0.2,
+            print_cost=False
+        )
+    
+    def _review_prompts(self, pr_content: Dict, pr_author: str,
+                        stage: Optional[str] = None) -> Tuple[str, str, str]:
+        """
+        Build the system prompt and user prompt for a PR review.
+        
+        The review cache key covers the reviewer, the stage and the file
+        contents only, so a retried stage resubmitted unchanged under a new
+        PR number is answered from the cache.
         
         Args:
             pr_content: PR content dictionary
             pr_author: "A" or "B"
+            stage: Stage the PR belongs to
             
         Returns:
-            Tuple of (review_type, comment, reasoning)
-            review_type: "APPROVE", "REQUEST_CHANGES", or "COMMENT"
+            Tuple of (sys_prompt, prompt, review cache key)
         """
         # Build context including past reviews given
         review_context = self._build_review_context()
@@ -273,23 +633,28 @@ AI研究の専門家として、与えられた大枠の研究テーマから、
   "reasoning": "この判断をした理由"
 }}"""
         
-        response = query_model_gemini(
-            model_str=self.model,
-            system_prompt=sys_prompt,
-            prompt=prompt,
-            gemini_api_key=self.gemini_api_key,
-            temp=0.6,
-            print_cost=False
-        )
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.scientist_id}\n{stage}\n".encode())
+        for filename, content in sorted(pr_content['files'].items()):
+            digest.update(f"=== {filename} ===\n{content}\n".encode())
+        cache_key = digest.hexdigest()
         
-        # Parse response
-        import json
-        import re
+        return sys_prompt, prompt, cache_key
+    
+    @staticmethod
+    def _parse_review(response: str) -> Tuple[str, str, str]:
+        """
+        Parse a review response.
         
+        Args:
+            response: Model response
+            
+        Returns:
+            Tuple of (review_type, comment, reasoning)
+        """
         try:
-            json_match = re.search(r'\{[^}]+\}', response, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
+            result = extract_json(response)
+            if result is not None:
                 review_type = result.get("review_type", "COMMENT")
                 comment = result.get("comment", response)
                 reasoning = result.get("reasoning", "")
@@ -302,19 +667,119 @@ AI研究の専門家として、与えられた大枠の研究テーマから、
             comment = response
             reasoning = "パースエラー"
         
-        # Store in review history (CRITICAL: store all reviews)
-        self.review_history.append({
+        return review_type, comment, reasoning
+    
+    def _record_review(self, pr_content: Dict, pr_author: str,
+                       review: Tuple[str, str, str]) -> Tuple[str, str, str]:
+        """
+        Store a review in the review history.
+        
+        Args:
+            pr_content: PR content dictionary
+            pr_author: "A" or "B"
+            review: Tuple of (review_type, comment, reasoning)
+            
+        Returns:
+            Tuple of (review_type, comment, reasoning)
+        """
+        review_type, comment, reasoning = review
+        
+        # Store in review history (CRITICAL: store all reviews).
+        # Prefixes used by the context builders are sliced once here.
+        entry = {
             "pr_number": pr_content['number'],
             "pr_author": pr_author,
             "pr_title": pr_content['title'],
             "review_type": review_type,
             "comment": comment,
+            "comment_100": comment[:100],
+            "comment_200": comment[:200],
             "reasoning": reasoning,
             "timestamp": None  # Will be set by simulation
-        })
+        }
+        self.review_history.append(entry)
+        
+        reviews_given = self.memory_cache["reviews_given"]
+        reviews_given.append(f"PR#{pr_content['number']}: {review_type} - {entry['comment_100']}...")
+        del reviews_given[:-MEMORY_REVIEW_K]
         
         return review_type, comment, reasoning
     
+    def _cache_review(self, cache_key: str, response: str) -> Tuple[str, str, str]:
+        """
+        Parse a review response and cache it unless parsing failed.
+        
+        Args:
+            cache_key: Review cache key
+            response: Model response
+            
+        Returns:
+            Tuple of (review_type, comment, reasoning)
+        """
+        review = self._parse_review(response)
+        if review[2] not in ("JSONパースに失敗", "パースエラー"):
+            self._review_cache[cache_key] = review
+        return review
+    
+    def review_pr(self, pr_content: Dict, pr_author: str,
+                  stage: Optional[str] = None) -> Tuple[str, str, str]:
+        """
+        Review a pull request from the other scientist.
+        
+        Args:
+            pr_content: PR content dictionary
+            pr_author: "A" or "B"
+            stage: Stage the PR belongs to (part of the review cache key)
+            
+        Returns:
+            Tuple of (review_type, comment, reasoning)
+            review_type: "APPROVE", "REQUEST_CHANGES", or "COMMENT"
+        """
+        sys_prompt, prompt, cache_key = self._review_prompts(pr_content, pr_author, stage)
+        if cache_key in self._review_cache:
+            return self._record_review(pr_content, pr_author, self._review_cache[cache_key])
+        
+        response = query_model_gemini(
+            model_str=self.model,
+            system_prompt=sys_prompt,
+            prompt=prompt,
+            gemini_api_key=self.gemini_api_key,
+            temp=0.6,
+            print_cost=False,
+            stop_when=json_object_complete
+        )
+        
+        return self._record_review(pr_content, pr_author, self._cache_review(cache_key, response))
+    
+    async def review_pr_async(self, pr_content: Dict, pr_author: str,
+                              stage: Optional[str] = None) -> Tuple[str, str, str]:
+        """
+        Async version of review_pr.
+        
+        Args:
+            pr_content: PR content dictionary
+            pr_author: "A" or "B"
+            stage: Stage the PR belongs to (part of the review cache key)
+            
+        Returns:
+            Tuple of (review_type, comment, reasoning)
+        """
+        sys_prompt, prompt, cache_key = self._review_prompts(pr_content, pr_author, stage)
+        if cache_key in self._review_cache:
+            return self._record_review(pr_content, pr_author, self._review_cache[cache_key])
+        
+        response = await query_model_gemini_async(
+            model_str=self.model,
+            system_prompt=sys_prompt,
+            prompt=prompt,
+            gemini_api_key=self.gemini_api_key,
+            temp=0.6,
+            print_cost=False,
+            stop_when=json_object_complete
+        )
+        
+        return self._record_review(pr_content, pr_author, self._cache_review(cache_key, response))
+    
     def _build_review_context(self) -> str:
         """
         Build context string from past reviews given.
@@ -325,14 +790,14 @@ AI研究の専門家として、与えられた大枠の研究テーマから、
         if not self.review_history:
             return "（まだレビュー履歴がありません）"
         
-        context = ""
+        buf = io.StringIO()
         for i, review in enumerate(self.review_history[-5:], 1):  # Last 5 reviews
-            context += f"\nレビュー{i}:\n"
-            context += f"  PR: {review['pr_title']}\n"
-            context += f"  判定: {review['review_type']}\n"
-            context += f"  コメント: {review['comment'][:200]}...\n"
+            buf.write(f"\nレビュー{i}:\n")
+            buf.write(f"  PR: {review['pr_title']}\n")
+            buf.write(f"  判定: {review['review_type']}\n")
+            buf.write(f"  コメント: {review['comment_200']}...\n")
         
-        return context
+        return buf.getvalue()
     
     def context(self, phase: str) -> str:
         """
@@ -344,59 +809,36 @@ AI研究の専門家として、与えられた大枠の研究テーマから、
         Returns:
             Context string
         """
-        context_parts = []
+        memory = self.memory_cache
+        buf = io.StringIO()
         
         # Research theme
-        if self.research_theme:
-            context_parts.append(f"あなたの研究テーマ: {self.research_theme}")
+        if memory["theme"]:
+            buf.write(f"あなたの研究テーマ: {memory['theme']}\n")
         
         # Citizen feedback
-        if self.citizen_feedback:
-            context_parts.append("\n市民からのフィードバック:")
-            for feedback in self.citizen_feedback:
-                context_parts.append(
-                    f"  - {feedback['citizen_name']}: {feedback['comment'][:100]}... "
-                    f"(支援額: {feedback['reward_amount']}円)"
-                )
+        if memory["citizen_summary"]:
+            buf.write(f"\n市民からのフィードバック:\n{memory['citizen_summary']}\n")
         
         # PR history (reviews received)
-        if self.pr_history:
-            context_parts.append("\nあなたのPRに対するレビュー履歴:")
-            for pr in self.pr_history[-3:]:  # Last 3 PRs
-                context_parts.append(
-                    f"  PR#{pr.get('number', 'N/A')}: {pr.get('result', 'N/A')} - "
-                    f"{pr.get('feedback', '')[:100]}..."
-                )
+        if memory["reviews_received"]:
+            buf.write("\nあなたのPRに対するレビュー履歴:\n")
+            for line in memory["reviews_received"]:
+                buf.write(f"  {line}\n")
         
         # Review history (reviews given)
-        if self.review_history:
-            context_parts.append("\nあなたが与えたレビュー履歴:")
-            for review in self.review_history[-3:]:  # Last 3 reviews
-                context_parts.append(
-                    f"  PR#{review['pr_number']}: {review['review_type']} - "
-                    f"{review['comment'][:100]}..."
-                )
-        
-        # Previous stage outputs
-        if phase in ["experiment_plan", "experiment_implementation", "results_interpretation", "paper_writing"]:
-            if self.hypothesis:
-                context_parts.append(f"\nあなたの仮説: {self.hypothesis[:200]}...")
-        
-        if phase in ["experiment_implementation", "results_interpretation", "paper_writing"]:
-            if self.experiment_plan:
-                context_parts.append(f"\nあなたの実験計画: {self.experiment_plan[:200]}...")
-        
-        if phase in ["results_interpretation", "paper_writing"]:
-            if self.experiment_code:
-                context_parts.append(f"\nあなたの実験コード: {self.experiment_code[:200]}...")
-            if self.results:
-                context_parts.append(f"\nあなたの実験結果: {self.results[:200]}...")
-        
-        if phase == "paper_writing":
-            if self.interpretation:
-                context_parts.append(f"\nあなたの結果解釈: {self.interpretation[:200]}...")
-        
-        return "\n".join(context_parts) if context_parts else "（コンテキストなし）"
+        if memory["reviews_given"]:
+            buf.write("\nあなたが与えたレビュー履歴:\n")
+            for line in memory["reviews_given"]:
+                buf.write(f"  {line}\n")
+        
+        # Previous stage outputs (summaries only; see seek_information for details)
+        for slot, label in _PHASE_DEPS.get(phase, ()):
+            if memory[slot]:
+                buf.write(f"\n{label}: {memory[slot]}\n")
+        
+        context = buf.getvalue()
+        return context[:-1] if context else "（コンテキストなし）"
     
     def phase_prompt(self, phase: str) -> str:
         """
@@ -408,15 +850,7 @@ AI研究の専門家として、与えられた大枠の研究テーマから、
         Returns:
             Phase prompt string
         """
-        prompts = {
-            "theme_decision": "大枠の研究テーマから、具体的で実行可能な研究テーマを決定してください。",
-            "hypothesis": "研究テーマに基づいて、検証可能な仮説を提案してください。",
-            "experiment_plan": "仮説を検証するための実験計画を立案してください。",
-            "experiment_implementation": "実験計画に基づいて、実験を実装してください。",
-            "results_interpretation": "実験結果を解釈し、仮説との関係を考察してください。",
-            "paper_writing": "研究全体をまとめた論文を執筆してください。"
-        }
-        return prompts.get(phase, "")
+        return _PHASE_PROMPTS.get(phase, "")
     
     def role_description(self) -> str:
         """Get role description."""
@@ -440,9 +874,20 @@ AI研究の専門家として、与えられた大枠の研究テーマから、
         self.citizen_feedback.append({
             "citizen_name": citizen_name,
             "comment": comment,
+            "comment_short": comment[:100],
             "reward_amount": reward_amount,
             "reasoning": reasoning
         })
+        
+        total = sum(f["reward_amount"] for f in self.citizen_feedback)
+        count = len(self.citizen_feedback)
+        most = max(self.citizen_feedback, key=lambda f: f["reward_amount"])
+        least = min(self.citizen_feedback, key=lambda f: f["reward_amount"])
+        self.memory_cache["citizen_summary"] = (
+            f"  {count}人の市民が評価（合計支援額: {total}円, 平均: {total / count:.0f}円）\n"
+            f"  - 最も支持: {most['citizen_name']}: {most['comment_short']}... (支援額: {most['reward_amount']}円)\n"
+            f"  - 最も慎重: {least['citizen_name']}: {least['comment_short']}... (支援額: {least['reward_amount']}円)"
+        )
     
     def add_pr_feedback(self, pr_number: int, result: str, feedback: str):
         """
@@ -453,9 +898,34 @@ AI研究の専門家として、与えられた大枠の研究テーマから、
             result: "APPROVED" or "REJECTED"
             feedback: Review feedback
         """
-        self.pr_history.append({
+        entry = {
             "number": pr_number,
             "result": result,
-            "feedback": feedback
-        })
+            "feedback": feedback,
+            "feedback_100": feedback[:100]
+        }
+        self.pr_history.append(entry)
+        
+        reviews_received = self.memory_cache["reviews_received"]
+        reviews_received.append(f"PR#{pr_number}: {result} - {entry['feedback_100']}...")
+        del reviews_received[:-MEMORY_REVIEW_K]
+
 
+async def run_theme_decision_parallel(scientist_a: AIScientistAgent, scientist_b: AIScientistAgent,
+                                      general_topic: str) -> Tuple[str, str]:
+    """
+    Have both scientists decide their research themes concurrently.
+    
+    Args:
+        scientist_a: Scientist A
+        scientist_b: Scientist B
+        general_topic: General research topic provided
+        
+    Returns:
+        Tuple of (theme_a, theme_b)
+    """
+    theme_a, theme_b = await asyncio.gather(
+        scientist_a.decide_research_theme_async(general_topic),
+        scientist_b.decide_research_theme_async(general_topic)
+    )
+    return theme_a, theme_b
@@ -6,8 +6,24 @@ research themes proposed by AI scientists and provide monetary support
 and opinions based on their personal values and perspectives.
 """
 
-from typing import Dict, Tuple
-from gemini_inference import query_model_gemini
+import asyncio
+import threading
+from typing import Dict, Optional, Tuple
+from gemini_inference import (
+    query_model_gemini,
+    query_model_gemini_async,
+    create_gemini_cache,
+    is_cacheable_prompt,
+    extract_json,
+)
+from citizen_cache import CitizenEvaluationCache
+
+
+# Maximum number of citizen evaluations in flight at once
+MAX_CONCURRENT_EVALUATIONS = 10
+
+# Reasoning returned when the model response has no JSON (never cached)
+PARSE_FAILURE_REASONING = "JSONパースに失敗しました"
 
 
 class CitizenAgent:
@@ -15,6 +31,12 @@ class CitizenAgent:
     Base class for citizen agents who evaluate research themes.
     """
     
+    __slots__ = (
+        "name", "age", "occupation", "persona", "values", "gemini_api_key", "model",
+        "_system_prompts", "_prompt_template", "_cache_names",
+        "_cache_lock", "eval_cache"
+    )
+    
     def __init__(self, name: str, age: int, occupation: str, persona: str,
                  values: str, gemini_api_key: str, model: str = "gemini-2.0-flash-lite"):
         """
@@ -36,19 +58,36 @@ class CitizenAgent:
         self.values = values
         self.gemini_api_key = gemini_api_key
         self.model = model
+        
+        # Prompts are rendered once per scientist; only the theme varies per call
+        self._system_prompts: Dict[str, str] = {}
+        self._prompt_template = (
+            "【研究テーマ】\n"
+            "{scientist_name}の研究テーマ:\n"
+            "{research_theme}\n\n"
+            f"上記の研究テーマについて、あなた（{self.name}、{self.age}歳、{self.occupation}）"
+            "としての評価をJSON形式で返してください。"
+        )
+        
+        # Gemini context cache for each scientist's system prompt (created
+        # lazily, and only if the prompt is large enough to be cached at all)
+        self._cache_names: Dict[str, Optional[str]] = {}
+        self._cache_lock = threading.Lock()
+        
+        # Shared cache of past evaluations (set by create_citizen_agents)
+        self.eval_cache: Optional[CitizenEvaluationCache] = None
     
-    def evaluate_research_theme(self, scientist_name: str, research_theme: str) -> Tuple[str, int, str]:
+    def _render_system_prompt(self, scientist_name: str) -> str:
         """
-        Evaluate a research theme and provide opinion and monetary support.
+        Render the system prompt for themes proposed by one scientist.
         
         Args:
             scientist_name: Name of the scientist (e.g., "Scientist A")
-            research_theme: The specific research theme to evaluate
             
         Returns:
-            Tuple of (comment, reward_amount, reasoning)
+            System prompt string
         """
-        system_prompt = f"""あなたは{self.name}です。
+        return f"""あなたは{self.name}です。
 年齢: {self.age}歳
 職業: {self.occupation}
 性格・背景: {self.persona}
@@ -73,12 +112,110 @@ class CitizenAgent:
 }}
 
 あなたらしい自然な口調で書いてください。"""
-
-        prompt = f"""【研究テーマ】
-{scientist_name}の研究テーマ:
-{research_theme}
-
-上記の研究テーマについて、あなた（{self.name}、{self.age}歳、{self.occupation}）としての評価をJSON形式で返してください。"""
+    
+    def _build_prompts(self, scientist_name: str, research_theme: str) -> Tuple[str, str]:
+        """
+        Build the system prompt and user prompt for a theme evaluation.
+        
+        Args:
+            scientist_name: Name of the scientist (e.g., "Scientist A")
+            research_theme: The specific research theme to evaluate
+            
+        Returns:
+            Tuple of (system_prompt, prompt)
+        """
+        prompt = self._prompt_template.format(
+            scientist_name=scientist_name,
+            research_theme=research_theme
+        )
+        system_prompt = self._system_prompts.get(scientist_name)
+        if system_prompt is None:
+            system_prompt = self._render_system_prompt(scientist_name)
+            self._system_prompts[scientist_name] = system_prompt
+        return system_prompt, prompt
+    
+    def _get_cache_name(self, scientist_name: str, system_prompt: str) -> Optional[str]:
+        """
+        Get the context cache for a scientist's system prompt, creating it on
+        first use. Every theme from that scientist reuses the same cache.
+        
+        Args:
+            scientist_name: Name of the scientist
+            system_prompt: System prompt rendered for that scientist
+            
+        Returns:
+            Cache name, or None if caching is unavailable
+        """
+        if not is_cacheable_prompt(system_prompt):
+            return None
+        with self._cache_lock:
+            if scientist_name not in self._cache_names:
+                self._cache_names[scientist_name] = create_gemini_cache(
+                    model_str=self.model,
+                    system_prompt=system_prompt,
+                    gemini_api_key=self.gemini_api_key
+                )
+            return self._cache_names[scientist_name]
+    
+    @staticmethod
+    def _parse_evaluation(response: str) -> Tuple[str, int, str]:
+        """
+        Parse the model response into an evaluation tuple.
+        
+        Args:
+            response: Raw model response
+            
+        Returns:
+            Tuple of (comment, reward_amount, reasoning)
+        """
+        # Extract JSON from response
+        result = extract_json(response)
+        if result is not None:
+            comment = result.get("comment", "")
+            try:
+                reward_amount = int(result.get("reward_amount", 100))
+            except (TypeError, ValueError):
+                reward_amount = 100
+            reasoning = result.get("reasoning", "")
+            
+            # Validate reward amount
+            reward_amount = max(1, min(1000, reward_amount))
+            
+            return comment, reward_amount, reasoning
+        else:
+            # Fallback if JSON not found
+            return response, 100, PARSE_FAILURE_REASONING
+    
+    def _store_evaluation(self, scientist_name: str, research_theme: str,
+                          result: Tuple[str, int, str]):
+        """
+        Store a successfully parsed evaluation in the shared cache.
+        
+        Args:
+            scientist_name: Name of the scientist who proposed the theme
+            research_theme: The research theme that was evaluated
+            result: Tuple of (comment, reward_amount, reasoning)
+        """
+        if self.eval_cache is not None and result[2] != PARSE_FAILURE_REASONING:
+            self.eval_cache.put(self.name, scientist_name, research_theme, result)
+    
+    def evaluate_research_theme(self, scientist_name: str, research_theme: str) -> Tuple[str, int, str]:
+        """
+        Evaluate a research theme and provide opinion and monetary support.
+        
+        Args:
+            scientist_name: Name of the scientist (e.g., "Scientist A")
+            research_theme: The specific research theme to evaluate
+            
+        Returns:
+            Tuple of (comment, reward_amount, reasoning)
+        """
+        if self.eval_cache is not None:
+            cached = self.eval_cache.get(self.name, scientist_name, research_theme)
+            if cached is not None:
+                return cached
+        
+        system_prompt, prompt = self._build_prompts(scientist_name, research_theme)
 
         try:
             response = query_model_gemini(
@@ -87,44 +224,75 @@ class CitizenAgent:
                 system_prompt=system_prompt,
                 gemini_api_key=self.gemini_api_key,
                 temp=0.8,
-                print_cost=False
+                print_cost=False,
+                cached_content=self._get_cache_name(scientist_name, system_prompt)
             )
-            
-            # Extract JSON from response
-            import json
-            import re
-            
-            # Try to find JSON in response
-            json_match = re.search(r'\{[^}]+\}', response, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-                comment = result.get("comment", "")
-                reward_amount = int(result.get("reward_amount", 100))
-                reasoning = result.get("reasoning", "")
-                
-                # Validate reward amount
-                reward_amount = max(1, min(1000, reward_amount))
-                
-                return comment, reward_amount, reasoning
-            else:
-                # Fallback if JSON not found
-                return response, 100, "JSONパースに失敗しました"
+            result = self._parse_evaluation(response)
+            self._store_evaluation(scientist_name, research_theme, result)
+            return result
                 
         except Exception as e:
             error_msg = f"評価中にエラーが発生しました: {str(e)}"
             return error_msg, 100, "エラーのため標準額を設定"
     
+    async def evaluate_research_theme_async(self, scientist_name: str,
+                                            research_theme: str) -> Tuple[str, int, str]:
+        """
+        Async version of evaluate_research_theme.
+        
+        Unlike the sync version, a failed query is raised rather than turned
+        into a default evaluation.
+        
+        Args:
+            scientist_name: Name of the scientist (e.g., "Scientist A")
+            research_theme: The specific research theme to evaluate
+            
+        Returns:
+            Tuple of (comment, reward_amount, reasoning)
+            
+        Raises:
+            Exception: If the Gemini query fails
+        """
+        if self.eval_cache is not None:
+            cached = await asyncio.to_thread(self.eval_cache.get, self.name,
+                                           scientist_name, research_theme)
+            if cached is not None:
+                return cached
+        
+        system_prompt, prompt = self._build_prompts(scientist_name, research_theme)
+        
+        # Query failures (e.g., an invalid API key or exhausted quota after
+        # retries) propagate so the caller can cancel the other evaluations
+        cache_name = self._cache_names.get(scientist_name)
+        if scientist_name not in self._cache_names and is_cacheable_prompt(system_prompt):
+            cache_name = await asyncio.to_thread(self._get_cache_name, scientist_name, system_prompt)
+        response = await query_model_gemini_async(
+            model_str=self.model,
+            prompt=prompt,
+            system_prompt=system_prompt,
+            gemini_api_key=self.gemini_api_key,
+            temp=0.8,
+            print_cost=False,
+            cached_content=cache_name
+        )
+        result = self._parse_evaluation(response)
+        await asyncio.to_thread(self._store_evaluation, scientist_name,
+                                research_theme, result)
+        return result
+    
     def __str__(self) -> str:
         return f"{self.name} ({self.age}歳, {self.occupation})"
 
 
-def create_citizen_agents(gemini_api_key: str, model: str = "gemini-2.0-flash-lite") -> Dict[str, CitizenAgent]:
+def create_citizen_agents(gemini_api_key: str, model: str = "gemini-2.0-flash-lite",
+                          eval_cache: Optional[CitizenEvaluationCache] = None) -> Dict[str, CitizenAgent]:
     """
     Create all 10 citizen agents with diverse personas.
     
     Args:
         gemini_api_key: Google Gemini API key
         model: Gemini model to use
+        eval_cache: Optional cache of past evaluations shared by all citizens
         
     Returns:
         Dictionary of citizen agents keyed by name
@@ -241,9 +409,78 @@ def create_citizen_agents(gemini_api_key: str, model: str = "gemini-2.0-flash-li
         model=model
     )
     
+    for citizen in citizens.values():
+        citizen.eval_cache = eval_cache
+    
     return citizens
 
 
+async def _bounded(semaphore: asyncio.Semaphore, coro):
+    """Await a coroutine while holding a semaphore slot."""
+    async with semaphore:
+        return await coro
+
+
+async def evaluate_all_citizens(citizens: Dict[str, CitizenAgent], themes: Dict[str, str],
+                                max_concurrency: int = MAX_CONCURRENT_EVALUATIONS
+                                ) -> Dict[Tuple[str, str], object]:
+    """
+    Have every citizen evaluate every research theme concurrently.
+    
+    The first failing evaluation cancels the ones still pending (e.g., so an
+    invalid API key does not keep firing requests); completed evaluations
+    are kept. Uses asyncio.TaskGroup where available (Python 3.11+).
+    
+    Args:
+        citizens: Dictionary of citizen agents keyed by name
+        themes: Research themes keyed by scientist name (e.g., "研究者A")
+        max_concurrency: Maximum number of evaluations in flight at once
+        
+    Returns:
+        Dictionary keyed by (citizen name, scientist name), in citizen order
+        with themes in the given order. Values are (comment, reward_amount,
+        reasoning) tuples, or the exception a failed evaluation raised;
+        cancelled evaluations are left out.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    jobs = [
+        (citizen_name, scientist_name)
+        for citizen_name in citizens
+        for scientist_name in themes
+    ]
+    coros = [
+        citizens[citizen_name].evaluate_research_theme_async(scientist_name, themes[scientist_name])
+        for citizen_name, scientist_name in jobs
+    ]
+    tasks = []
+    try:
+        if hasattr(asyncio, "TaskGroup"):
+            async with asyncio.TaskGroup() as task_group:
+                tasks.extend(task_group.create_task(_bounded(semaphore, coro)) for coro in coros)
+        else:
+            tasks.extend(asyncio.ensure_future(_bounded(semaphore, coro)) for coro in coros)
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+    except Exception:
+        # Failures are reported per evaluation below
+        pass
+    finally:
+        # Coroutines cancelled before they started were never awaited
+        for coro in coros:
+            coro.close()
+    
+    results = {}
+    for job, task in zip(jobs, tasks):
+        if task.cancelled():
+            continue
+        results[job] = task.exception() or task.result()
+    return results
+
+
 # Example usage
 if __name__ == "__main__":
     import os
@@ -0,0 +1,140 @@
+"""
+Citizen Evaluation Cache Module
+
+This module caches citizen evaluations of research themes so that a theme
+that recurs within a run does not trigger a new Gemini call. Entries are
+keyed on the exact (citizen, scientist, theme) triple.
+"""
+
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+DEFAULT_CACHE_FILE = "citizen_eval.sqlite"
+
+
+def _theme_hash(research_theme: str) -> str:
+    """Stable hash of a research theme used as the exact-match key."""
+    return hashlib.sha256(research_theme.encode("utf-8")).hexdigest()
+
+
+class CitizenEvaluationCache:
+    """
+    Cache of (comment, reward_amount, reasoning) per (citizen, scientist, theme).
+    
+    Lookups hit an in-memory LRU first and fall back to the SQLite table.
+    """
+    
+    def __init__(self, db_path: str, max_memory_entries: int = 1024):
+        """
+        Initialize the evaluation cache.
+        
+        Args:
+            db_path: Path to the SQLite database file
+            max_memory_entries: Maximum number of entries kept in memory
+        """
+        self.db_path = Path(db_path).expanduser()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_memory_entries = max_memory_entries
+        
+        self._memory: "OrderedDict[Tuple[str, str, str], Tuple[str, int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS citizen_evaluations (
+                citizen TEXT NOT NULL,
+                scientist TEXT NOT NULL,
+                theme_hash TEXT NOT NULL,
+                comment TEXT NOT NULL,
+                reward_amount INTEGER NOT NULL,
+                reasoning TEXT NOT NULL,
+                PRIMARY KEY (citizen, scientist, theme_hash)
+            )"""
+        )
+        self._conn.commit()
+    
+    def _remember(self, key: Tuple[str, str, str], value: Tuple[str, int, str]):
+        """Insert into the in-memory LRU, evicting the oldest entry if full."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+    
+    def get(self, citizen_name: str, scientist_name: str,
+            research_theme: str) -> Optional[Tuple[str, int, str]]:
+        """
+        Look up a cached evaluation.
+        
+        Args:
+            citizen_name: Name of the citizen
+            scientist_name: Name of the scientist who proposed the theme
+            research_theme: Research theme being evaluated
+        
+        Returns:
+            Cached (comment, reward_amount, reasoning), or None on a miss
+        """
+        key = (citizen_name, scientist_name, _theme_hash(research_theme))
+        
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            
+            row = self._conn.execute(
+                "SELECT comment, reward_amount, reasoning FROM citizen_evaluations "
+                "WHERE citizen = ? AND scientist = ? AND theme_hash = ?",
+                key
+            ).fetchone()
+            if row is None:
+                return None
+            value = (row[0], int(row[1]), row[2])
+            self._remember(key, value)
+            return value
+    
+    def put(self, citizen_name: str, scientist_name: str, research_theme: str,
+            value: Tuple[str, int, str]):
+        """
+        Store an evaluation.
+        
+        Args:
+            citizen_name: Name of the citizen
+            scientist_name: Name of the scientist who proposed the theme
+            research_theme: Research theme that was evaluated
+            value: (comment, reward_amount, reasoning)
+        """
+        key = (citizen_name, scientist_name, _theme_hash(research_theme))
+        
+        with self._lock:
+            self._remember(key, value)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO citizen_evaluations "
+                "(citizen, scientist, theme_hash, comment, reward_amount, reasoning) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                key + (value[0], value[1], value[2])
+            )
+            self._conn.commit()
+    
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
+
+
+def init_eval_cache(data_dir: str) -> CitizenEvaluationCache:
+    """
+    Create a citizen evaluation cache stored under data_dir.
+    
+    Pass the run's own directory (e.g. its log directory) so that cached
+    evaluations are never shared across runs or seeds.
+    
+    Args:
+        data_dir: Directory for the SQLite database
+    
+    Returns:
+        Citizen evaluation cache
+    """
+    return CitizenEvaluationCache(db_path=str(Path(data_dir).expanduser() / DEFAULT_CACHE_FILE))
@@ -7,13 +7,146 @@ following the pattern of the existing inference.py module.
 
 import time
 import os
-from typing import Optional, Dict
-import google.generativeai as genai
+import json
+import random
+import asyncio
+import datetime
+import hashlib
+import threading
+import weakref
+from collections import defaultdict
+from typing import Callable, Optional, Dict, Tuple
 
+from llm_cache import LLMResponseCache, cache_enabled, make_cache_key
+
+
+# google.generativeai pulls in grpc/protobuf/auth, so it is imported on first
+# use (see _ensure_configured); cost/usage helpers never load it
+genai = None
 
 # Token usage tracking
-TOKENS_IN = {}
-TOKENS_OUT = {}
+TOKENS_IN = defaultdict(int)
+TOKENS_OUT = defaultdict(int)
+
+# Gemini pricing (as of 2024), USD per token
+# gemini-pro: $0.00025 per 1K characters for input, $0.0005 per 1K characters for output
+# Approximation: 1 token ≈ 4 characters
+_COSTMAP_IN = {
+    "gemini-pro": 0.00025 / 1000 * 4,
+    "gemini-1.5-pro": 0.00125 / 1000 * 4,
+    "gemini-1.5-flash": 0.000075 / 1000 * 4,
+}
+_COSTMAP_OUT = {
+    "gemini-pro": 0.0005 / 1000 * 4,
+    "gemini-1.5-pro": 0.005 / 1000 * 4,
+    "gemini-1.5-flash": 0.0003 / 1000 * 4,
+}
+
+# Map model names to Gemini model names
+MODEL_MAPPING = {
+    "gemini-pro": "gemini-2.0-flash-lite",
+    "gemini-1.5-pro": "gemini-1.5-pro",
+    "gemini-1.5-flash": "gemini-1.5-flash",
+    "gemini-2.0-flash-lite": "gemini-2.0-flash-lite",
+    "gemini": "gemini-2.0-flash-lite",  # Default
+}
+
+# Retry backoff: timeout * 2**attempt plus up to BACKOFF_JITTER seconds of
+# jitter, capped at BACKOFF_CAP seconds (rate/quota errors wait twice as long)
+BACKOFF_JITTER = 1.0
+BACKOFF_CAP = 60.0
+_BACKOFF_RNG = random.Random()
+
+# Error message markers of failures that retrying cannot fix (bad or unauthorized key)
+FATAL_ERROR_MARKERS = ("API_KEY_INVALID", "API key not valid", "PERMISSION_DENIED", "UNAUTHENTICATED")
+
+# Context caches created in this process, keyed by cache name
+_CACHED_CONTENTS = {}
+
+# Smallest prompt Gemini accepts for a context cache, in tokens. Prompt sizes
+# are estimated at 4 characters per token (as in the cost map above) and must
+# clear the minimum by CONTEXT_CACHE_MARGIN, so borderline prompts are skipped
+# rather than sent to a create call that would be rejected.
+CONTEXT_CACHE_MIN_TOKENS = 1024
+CONTEXT_CACHE_MARGIN = 1.25
+
+# Decoder used to pull JSON objects out of free-form responses
+_JSON_DECODER = json.JSONDecoder()
+
+# System instruction stored in each context cache, keyed by cache name. A
+# request whose system prompt differs from its cache's sends its own system
+# prompt along as well, so it is never silently dropped.
+_CACHED_SYSTEM_PROMPTS: Dict[str, str] = {}
+
+# Responses to deterministic (temp 0 / unset) requests
+_RESPONSE_CACHE = LLMResponseCache(
+    max_entries=1024,
+    ttl_seconds=float(os.getenv("GEMINI_CACHE_TTL", "3600"))
+)
+
+# GenerativeModel instances keyed by (model name, sorted generation config).
+# Models are bound to the client of the key they were created under, so the
+# cache is cleared whenever _ensure_configured switches keys.
+_MODEL_CACHE: Dict[tuple, "genai.GenerativeModel"] = {}
+
+# aquery_gemini concurrency limits, one per event loop (semaphores are loop-bound)
+_SEMAPHORES: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+# Automatic context caching of system prompts that pass is_cacheable_prompt:
+# (model, prompt digest) -> cache name, or None if the model/prompt cannot be
+# cached. A prompt is only cached the second time it is seen, so one-off
+# prompts never pay for a cache.
+_CONTEXT_CACHE: Dict[Tuple[str, str], Optional[str]] = {}
+_SYSTEM_PROMPTS_SEEN = set()
+_CONTEXT_CACHE_LOCK = threading.Lock()
+
+# API key the SDK is currently configured with. genai.configure() discards the
+# SDK's cached clients, so it is only called when the key actually changes and
+# the underlying channel (and its TLS session) is reused across calls.
+_CONFIGURED_KEY: Optional[str] = None
+_CONFIGURE_LOCK = threading.Lock()
+
+
+def _ensure_configured(gemini_api_key: str):
+    """
+    Configure the Gemini SDK for an API key, reusing the existing client if unchanged.
+    
+    Also imports the SDK on first use; every SDK call goes through here first.
+    
+    Args:
+        gemini_api_key: Google Gemini API key
+    """
+    global _CONFIGURED_KEY, genai
+    with _CONFIGURE_LOCK:
+        if genai is None:
+            import google.generativeai as _genai
+            genai = _genai
+        if gemini_api_key != _CONFIGURED_KEY:
+            genai.configure(api_key=gemini_api_key)
+            _MODEL_CACHE.clear()
+            _CONFIGURED_KEY = gemini_api_key
+
+
+def _get_model(gemini_model_name: str, generation_config: Dict) -> "genai.GenerativeModel":
+    """
+    Get a GenerativeModel for a model name and generation config, reusing cached instances.
+    
+    Args:
+        gemini_model_name: Gemini model name
+        generation_config: Generation config (may be empty)
+        
+    Returns:
+        GenerativeModel instance
+    """
+    key = (gemini_model_name, tuple(sorted(generation_config.items())))
+    model = _MODEL_CACHE.get(key)
+    if model is None:
+        model = genai.GenerativeModel(
+            model_name=gemini_model_name,
+            generation_config=generation_config if generation_config else None
+        )
+        _MODEL_CACHE[key] = model
+    return model
 
 
 def curr_cost_est() -> float:
@@ -23,29 +156,271 @@ def curr_cost_est() -> float:
     Returns:
         Estimated cost in USD
     """
-    # Gemini pricing (as of 2024)
-    # gemini-pro: $0.00025 per 1K characters for input, $0.0005 per 1K characters for output
-    # Approximation: 1 token ≈ 4 characters
-    costmap_in = {
-        "gemini-pro": 0.00025 / 1000 * 4,  # per token
-        "gemini-1.5-pro": 0.00125 / 1000 * 4,
-        "gemini-1.5-flash": 0.000075 / 1000 * 4,
-    }
-    costmap_out = {
-        "gemini-pro": 0.0005 / 1000 * 4,
-        "gemini-1.5-pro": 0.005 / 1000 * 4,
-        "gemini-1.5-flash": 0.0003 / 1000 * 4,
-    }
+    return sum(
+        _COSTMAP_IN.get(model, 0.0) * TOKENS_IN[model] + _COSTMAP_OUT.get(model, 0.0) * TOKENS_OUT.get(model, 0)
+        for model in TOKENS_IN
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of tokens in a piece of text.
+    
+    Uses the 4-characters-per-token approximation, which undercounts
+    Japanese text, so size checks against it err on the side of "too small".
+    
+    Args:
+        text: Text to measure
+        
+    Returns:
+        Estimated token count
+    """
+    return len(text) // 4
+
+
+def is_cacheable_prompt(system_prompt: str) -> bool:
+    """
+    Check whether a system prompt is large enough for a Gemini context cache.
+    
+    Args:
+        system_prompt: System instructions
+        
+    Returns:
+        True if the estimated size clears CONTEXT_CACHE_MIN_TOKENS with margin
+    """
+    return estimate_tokens(system_prompt) >= CONTEXT_CACHE_MIN_TOKENS * CONTEXT_CACHE_MARGIN
+
+
+def _resolve_api_key(gemini_api_key: Optional[str]) -> str:
+    """
+    Resolve the API key (argument or GEMINI_API_KEY) and configure the SDK with it.
+    
+    Args:
+        gemini_api_key: Google Gemini API key, or None to read the environment
+        
+    Returns:
+        API key
+        
+    Raises:
+        ValueError: If no API key is available
+    """
+    # Get API key from environment if not provided
+    if gemini_api_key is None:
+        gemini_api_key = os.getenv('GEMINI_API_KEY')
+    
+    if gemini_api_key is None:
+        raise ValueError("Gemini API key not provided. Set GEMINI_API_KEY environment variable or pass gemini_api_key parameter.")
+    
+    # Configure Gemini
+    _ensure_configured(gemini_api_key)
+    return gemini_api_key
+
+
+def _generation_config(temp: Optional[float], max_tokens: Optional[int]) -> Dict:
+    """
+    Build the generation config for a request.
+    
+    Args:
+        temp: Temperature for generation
+        max_tokens: Maximum tokens to generate
+        
+    Returns:
+        Generation config dictionary (may be empty)
+    """
+    generation_config = {}
+    if temp is not None:
+        generation_config["temperature"] = temp
+    if max_tokens is not None:
+        generation_config["max_output_tokens"] = max_tokens
+    return generation_config
+
+
+def _response_cache_key(gemini_model_name: str, system_prompt: str, prompt: str,
+                        temp: Optional[float], max_tokens: Optional[int],
+                        stop_when: Optional[Callable[[str], bool]]) -> Optional[str]:
+    """
+    Get the response cache key for a request, or None if it must not be cached.
+    
+    Only deterministic requests (temp None or 0) are cached. Streamed requests
+    may stop early, so their (partial) answers are not cached either.
+    
+    Args:
+        gemini_model_name: Gemini model name
+        system_prompt: System instructions
+        prompt: User prompt
+        temp: Temperature for generation
+        max_tokens: Maximum tokens to generate
+        stop_when: Early-stop predicate of a streamed request
+        
+    Returns:
+        Cache key, or None
+    """
+    if (temp is not None and temp != 0.0) or stop_when is not None or not cache_enabled():
+        return None
+    return make_cache_key(
+        model=gemini_model_name,
+        system_prompt=system_prompt,
+        prompt=prompt,
+        max_tokens=max_tokens
+    )
+
+
+def _auto_cached_content(model_str: str, gemini_model_name: str, system_prompt: str,
+                         gemini_api_key: str) -> Optional[str]:
+    """
+    Get (creating if needed) a context cache for a repeated long system prompt.
+    
+    Args:
+        model_str: Model name
+        gemini_model_name: Gemini model name
+        system_prompt: System instructions
+        gemini_api_key: API key
+        
+    Returns:
+        Cache name, or None if the prompt is short, new, or cannot be cached
+    """
+    if not is_cacheable_prompt(system_prompt):
+        return None
+    
+    key = (gemini_model_name, hashlib.sha256(system_prompt.encode("utf-8")).hexdigest())
+    with _CONTEXT_CACHE_LOCK:
+        if key in _CONTEXT_CACHE:
+            cache_name = _CONTEXT_CACHE[key]
+            # Expired caches are dropped from _CACHED_CONTENTS; create a new one
+            if cache_name is None or cache_name in _CACHED_CONTENTS:
+                return cache_name
+        elif key not in _SYSTEM_PROMPTS_SEEN:
+            _SYSTEM_PROMPTS_SEEN.add(key)
+            return None
+        
+        _CONTEXT_CACHE[key] = create_gemini_cache(model_str, system_prompt, gemini_api_key)
+        return _CONTEXT_CACHE[key]
+
+
+def _model_for_attempt(gemini_model_name: str, generation_config: Dict, cached_content: Optional[str],
+                       system_prompt: str, prompt: str, combined_prompt: str) -> Tuple["genai.GenerativeModel", str]:
+    """
+    Get the model instance and the prompt to send for one attempt.
     
-    total_cost = 0.0
-    for model in TOKENS_IN:
-        if model in costmap_in:
-            total_cost += costmap_in[model] * TOKENS_IN[model]
-    for model in TOKENS_OUT:
-        if model in costmap_out:
-            total_cost += costmap_out[model] * TOKENS_OUT[model]
+    Args:
+        gemini_model_name: Gemini model name
+        generation_config: Generation config
+        cached_content: Name of a live context cache, or None
+        system_prompt: System instructions
+        prompt: User prompt
+        combined_prompt: System prompt and user prompt combined
+        
+    Returns:
+        Tuple of (model, request_prompt)
+    """
+    if cached_content is not None:
+        model = genai.GenerativeModel.from_cached_content(
+            cached_content=_CACHED_CONTENTS[cached_content],
+            generation_config=generation_config if generation_config else None
+        )
+        # Skip the system prompt if it is exactly what the cache already holds
+        if _CACHED_SYSTEM_PROMPTS.get(cached_content) == system_prompt:
+            return model, prompt
+        return model, combined_prompt
+    return _get_model(gemini_model_name, generation_config), combined_prompt
+
+
+def _response_text(response) -> str:
+    """Extract the text from a generate_content response."""
+    try:
+        return response.text
+    except Exception:
+        # No quick accessor (e.g., multiple candidates or parts); join the parts instead
+        return ''.join(part.text for part in getattr(response, 'parts', [])) or str(response)
+
+
+def _record_usage(model_str: str, request_prompt: str, answer: str, print_cost: bool, usage=None):
+    """
+    Track token usage for a completed request.
+    
+    Args:
+        model_str: Model name used for accounting
+        request_prompt: Prompt that was sent
+        answer: Generated text
+        print_cost: Whether to print cost estimation
+        usage: Response usage_metadata (exact counts), if available
+    """
+    if usage is not None and getattr(usage, 'total_token_count', 0):
+        input_tokens = usage.prompt_token_count
+        output_tokens = usage.candidates_token_count
+    else:
+        # No usage metadata (e.g., stream stopped early), so estimate
+        # Approximate: 1 token ≈ 4 characters
+        input_tokens = len(request_prompt) // 4
+        output_tokens = len(answer) // 4
     
-    return total_cost
+    TOKENS_IN[model_str] += input_tokens
+    TOKENS_OUT[model_str] += output_tokens
+    
+    # Print cost estimation
+    if print_cost:
+        cost = curr_cost_est()
+        print(f"Current experiment cost = ${cost:.4f} (Approximate, Gemini)")
+
+
+def _handle_query_error(e: Exception, attempt: int, tries: int, timeout: float,
+                        cached_content: Optional[str]) -> Tuple[Optional[str], Optional[float]]:
+    """
+    Decide how to retry after a failed request.
+    
+    Drops an unusable context cache (retrying immediately), gives up on
+    authentication errors, and otherwise picks a delay by error type.
+    
+    Args:
+        e: Exception raised by the request
+        attempt: Zero-based attempt number
+        tries: Number of retry attempts
+        timeout: Base retry delay in seconds (doubled on each attempt)
+        cached_content: Name of the context cache used, or None
+        
+    Returns:
+        Tuple of (cached_content to use next, delay in seconds or None to retry immediately)
+        
+    Raises:
+        Exception: The original exception, if it is an authentication error
+    """
+    error_msg = str(e)
+    print(f"Gemini API Exception (attempt {attempt + 1}/{tries}): {error_msg}")
+    
+    # An expired or unusable cache should not burn the remaining attempts
+    if cached_content is not None:
+        print("Context cache unavailable. Falling back to full prompt...")
+        _CACHED_CONTENTS.pop(cached_content, None)
+        _CACHED_SYSTEM_PROMPTS.pop(cached_content, None)
+        cached_content = None
+        if attempt < tries - 1:
+            return cached_content, None
+    
+    # An invalid or unauthorized API key fails the same way on every attempt
+    if any(marker in error_msg for marker in FATAL_ERROR_MARKERS):
+        print("Authentication failed. Not retrying.")
+        raise e
+    
+    # Exponential backoff with jitter so concurrent retries do not re-collide
+    delay = min(timeout * (2 ** attempt) + _BACKOFF_RNG.uniform(0, BACKOFF_JITTER), BACKOFF_CAP)
+    
+    # Check for specific error types
+    if "quota" in error_msg.lower() or "rate" in error_msg.lower():
+        print("Rate limit or quota exceeded. Waiting longer...")
+        return cached_content, min(delay * 2, BACKOFF_CAP)
+    elif "safety" in error_msg.lower():
+        print("Safety filter triggered. Trying again...")
+    return cached_content, delay
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Get the concurrency limit for aquery_gemini on the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _SEMAPHORES.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(int(os.getenv('GEMINI_MAX_CONCURRENCY', '16')))
+        _SEMAPHORES[loop] = semaphore
+    return semaphore
 
 
 def query_gemini(
@@ -57,11 +432,18 @@ def query_gemini(
     timeout: float = 5.0,
     temp: Optional[float] = None,
     max_tokens: Optional[int] = None,
-    print_cost: bool = True
+    print_cost: bool = True,
+    cached_content: Optional[str] = None,
+    stop_when: Optional[Callable[[str], bool]] = None
 ) -> str:
     """
     Query Google Gemini API for text generation.
     
+    Deterministic requests (temp None or 0) are served from an in-process
+    response cache when GEMINI_CACHE_ENABLED is on (the default). System
+    prompts large enough to cache (see is_cacheable_prompt) that recur are
+    moved into a Gemini context cache automatically.
+    
     Args:
         model_str: Model name (e.g., "gemini-pro", "gemini-1.5-pro", "gemini-1.5-flash")
         prompt: User prompt/query
@@ -72,6 +454,10 @@ def query_gemini(
         temp: Temperature for generation (0.0-1.0)
         max_tokens: Maximum tokens to generate
         print_cost: Whether to print cost estimation
+        cached_content: Name of a context cache (see create_gemini_cache);
+            system_prompt is only sent if it differs from the cached one
+        stop_when: If given, the response is streamed and returned as soon as
+            stop_when(text_so_far) is true (e.g., once a JSON object closes)
         
     Returns:
         Generated text response
@@ -79,100 +465,177 @@ def query_gemini(
     Raises:
         Exception: If all retry attempts fail
     """
-    # Get API key from environment if not provided
-    if gemini_api_key is None:
-        gemini_api_key = os.getenv('GEMINI_API_KEY')
+    gemini_api_key = _resolve_api_key(gemini_api_key)
     
-    if gemini_api_key is None:
-        raise ValueError("Gemini API key not provided. Set GEMINI_API_KEY environment variable or pass gemini_api_key parameter.")
-    
-    # Configure Gemini
-    genai.configure(api_key=gemini_api_key)
-    
-    # Map model names to Gemini model names
-    model_mapping = {
-        "gemini-pro": "gemini-2.0-flash-lite",
-        "gemini-1.5-pro": "gemini-1.5-pro",
-        "gemini-1.5-flash": "gemini-1.5-flash",
-        "gemini-2.0-flash-lite": "gemini-2.0-flash-lite",
-        "gemini": "gemini-2.0-flash-lite",  # Default
-    }
-    
-    gemini_model_name = model_mapping.get(model_str, "gemini-2.0-flash-lite")
-    
-    # Set generation config
-    generation_config = {}
-    if temp is not None:
-        generation_config["temperature"] = temp
-    if max_tokens is not None:
-        generation_config["max_output_tokens"] = max_tokens
+    gemini_model_name = MODEL_MAPPING.get(model_str, "gemini-2.0-flash-lite")
+    generation_config = _generation_config(temp, max_tokens)
     
     # Combine system prompt and user prompt
     # Gemini doesn't have a separate system prompt, so we prepend it to the user message
     combined_prompt = f"{system_prompt}\n\n{prompt}"
     
+    response_key = _response_cache_key(gemini_model_name, system_prompt, prompt, temp, max_tokens, stop_when)
+    if response_key is not None:
+        cached_answer = _RESPONSE_CACHE.get(response_key)
+        if cached_answer is not None:
+            return cached_answer
+    
+    # Only use caches that are still live in this process
+    if cached_content is not None and cached_content not in _CACHED_CONTENTS:
+        cached_content = None
+    if cached_content is None:
+        cached_content = _auto_cached_content(model_str, gemini_model_name, system_prompt, gemini_api_key)
+    
     # Retry loop
     for attempt in range(tries):
         try:
-            # Create model instance
-            model = genai.GenerativeModel(
-                model_name=gemini_model_name,
-                generation_config=generation_config if generation_config else None
+            model, request_prompt = _model_for_attempt(
+                gemini_model_name, generation_config, cached_content, system_prompt, prompt, combined_prompt
             )
             
             # Generate response
-            response = model.generate_content(combined_prompt)
-            
-            # Extract text from response
-            if hasattr(response, 'text'):
-                answer = response.text
-            elif hasattr(response, 'parts'):
-                answer = ''.join([part.text for part in response.parts])
+            if stop_when is not None:
+                # Stream and stop reading as soon as the caller has what it needs
+                chunks = []
+                usage = None
+                for chunk in model.generate_content(request_prompt, stream=True):
+                    usage = getattr(chunk, 'usage_metadata', None)
+                    try:
+                        chunks.append(chunk.text)
+                    except ValueError:
+                        continue  # Chunk without text (e.g., finish reason only)
+                    if stop_when(''.join(chunks)):
+                        usage = None  # Stopped early; final counts never arrive
+                        break
+                answer = ''.join(chunks)
             else:
-                answer = str(response)
+                response = model.generate_content(request_prompt)
+                answer = _response_text(response)
+                usage = getattr(response, 'usage_metadata', None)
+            
+            _record_usage(model_str, request_prompt, answer, print_cost, usage)
             
-            # Track token usage (approximation)
-            # Gemini API doesn't provide exact token counts, so we estimate
-            input_chars = len(combined_prompt)
-            output_chars = len(answer)
+            if response_key is not None:
+                _RESPONSE_CACHE.put(response_key, answer)
             
-            # Approximate: 1 token ≈ 4 characters
-            input_tokens = input_chars // 4
-            output_tokens = output_chars // 4
+            return answer
             
-            if model_str not in TOKENS_IN:
-                TOKENS_IN[model_str] = 0
-                TOKENS_OUT[model_str] = 0
+        except Exception as e:
+            cached_content, delay = _handle_query_error(
+                e, attempt, tries, timeout, cached_content
+            )
+            if delay is None:
+                continue
+            
+            # If this is the last attempt, raise the exception without waiting
+            if attempt == tries - 1:
+                raise
+            time.sleep(delay)
+    
+    raise Exception(f"Max retries ({tries}) exceeded: timeout")
+
+
+async def aquery_gemini(
+    model_str: str,
+    prompt: str,
+    system_prompt: str,
+    gemini_api_key: Optional[str] = None,
+    tries: int = 5,
+    timeout: float = 5.0,
+    temp: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    print_cost: bool = True,
+    cached_content: Optional[str] = None,
+    stop_when: Optional[Callable[[str], bool]] = None
+) -> str:
+    """
+    Async version of query_gemini using the SDK's native async client.
+    
+    Requests share one event loop instead of one thread each, and retries back
+    off with asyncio.sleep. At most GEMINI_MAX_CONCURRENCY (default 16)
+    requests are in flight per event loop.
+    
+    Args:
+        model_str: Model name (e.g., "gemini-pro", "gemini-1.5-pro", "gemini-1.5-flash")
+        prompt: User prompt/query
+        system_prompt: System instructions/context
+        gemini_api_key: Google Gemini API key
+        tries: Number of retry attempts
+        timeout: Timeout between retries in seconds
+        temp: Temperature for generation (0.0-1.0)
+        max_tokens: Maximum tokens to generate
+        print_cost: Whether to print cost estimation
+        cached_content: Name of a context cache holding system_prompt
+        stop_when: Stream and stop early once this returns True for the text so far
+        
+    Returns:
+        Generated text response
+        
+    Raises:
+        Exception: If all retry attempts fail
+    """
+    gemini_api_key = _resolve_api_key(gemini_api_key)
+    
+    gemini_model_name = MODEL_MAPPING.get(model_str, "gemini-2.0-flash-lite")
+    generation_config = _generation_config(temp, max_tokens)
+    combined_prompt = f"{system_prompt}\n\n{prompt}"
+    
+    response_key = _response_cache_key(gemini_model_name, system_prompt, prompt, temp, max_tokens, stop_when)
+    if response_key is not None:
+        cached_answer = _RESPONSE_CACHE.get(response_key)
+        if cached_answer is not None:
+            return cached_answer
+    
+    if cached_content is not None and cached_content not in _CACHED_CONTENTS:
+        cached_content = None
+    if cached_content is None and is_cacheable_prompt(system_prompt):
+        cached_content = await asyncio.to_thread(
+            _auto_cached_content, model_str, gemini_model_name, system_prompt, gemini_api_key
+        )
+    
+    for attempt in range(tries):
+        try:
+            # Only the request itself holds a concurrency slot, not the backoff
+            async with _get_semaphore():
+                model, request_prompt = _model_for_attempt(
+                    gemini_model_name, generation_config, cached_content, system_prompt, prompt, combined_prompt
+                )
+                
+                if stop_when is not None:
+                    chunks = []
+                    usage = None
+                    async for chunk in await model.generate_content_async(request_prompt, stream=True):
+                        usage = getattr(chunk, 'usage_metadata', None)
+                        try:
+                            chunks.append(chunk.text)
+                        except ValueError:
+                            continue
+                        if stop_when(''.join(chunks)):
+                            usage = None
+                            break
+                    answer = ''.join(chunks)
+                else:
+                    response = await model.generate_content_async(request_prompt)
+                    answer = _response_text(response)
+                    usage = getattr(response, 'usage_metadata', None)
             
-            TOKENS_IN[model_str] += input_tokens
-            TOKENS_OUT[model_str] += output_tokens
+            _record_usage(model_str, request_prompt, answer, print_cost, usage)
             
-            # Print cost estimation
-            if print_cost:
-                cost = curr_cost_est()
-                print(f"Current experiment cost = ${cost:.4f} (Approximate, Gemini)")
+            if response_key is not None:
+                _RESPONSE_CACHE.put(response_key, answer)
             
             return answer
             
         except Exception as e:
-            error_msg = str(e)
-            print(f"Gemini API Exception (attempt {attempt + 1}/{tries}): {error_msg}")
-            
-            # Check for specific error types
-            if "quota" in error_msg.lower() or "rate" in error_msg.lower():
-                print("Rate limit or quota exceeded. Waiting longer...")
-                time.sleep(timeout * (attempt + 1) * 2)
-            elif "safety" in error_msg.lower():
-                print("Safety filter triggered. Trying again...")
-                time.sleep(timeout)
-            else:
-                time.sleep(timeout)
+            cached_content, delay = _handle_query_error(
+                e, attempt, tries, timeout, cached_content
+            )
+            if delay is None:
+                continue
             
-            # If this is the last attempt, raise the exception
             if attempt == tries - 1:
                 raise
-            
-            continue
+            await asyncio.sleep(delay)
     
     raise Exception(f"Max retries ({tries}) exceeded: timeout")
 
@@ -186,7 +649,9 @@ def query_model_gemini(
     timeout: float = 5.0,
     temp: Optional[float] = None,
     max_tokens: Optional[int] = 2048,
-    print_cost: bool = True
+    print_cost: bool = True,
+    cached_content: Optional[str] = None,
+    stop_when: Optional[Callable[[str], bool]] = None
 ) -> str:
     """
     Unified interface for querying Gemini models.
@@ -202,6 +667,8 @@ def query_model_gemini(
         temp: Temperature
         max_tokens: Maximum tokens to generate
         print_cost: Whether to print cost
+        cached_content: Name of a context cache holding system_prompt
+        stop_when: Stream and stop early once this returns True for the text so far
         
     Returns:
         Generated response text
@@ -215,10 +682,150 @@ def query_model_gemini(
         timeout=timeout,
         temp=temp,
         max_tokens=max_tokens,
-        print_cost=print_cost
+        print_cost=print_cost,
+        cached_content=cached_content,
+        stop_when=stop_when
     )
 
 
+async def query_model_gemini_async(
+    model_str: str,
+    prompt: str,
+    system_prompt: str,
+    gemini_api_key: Optional[str] = None,
+    tries: int = 5,
+    timeout: float = 5.0,
+    temp: Optional[float] = None,
+    max_tokens: Optional[int] = 2048,
+    print_cost: bool = True,
+    cached_content: Optional[str] = None,
+    stop_when: Optional[Callable[[str], bool]] = None
+) -> str:
+    """
+    Async counterpart of query_model_gemini (see aquery_gemini).
+    
+    Args:
+        model_str: Model name
+        prompt: User prompt
+        system_prompt: System instructions
+        gemini_api_key: API key
+        tries: Retry attempts
+        timeout: Timeout between retries
+        temp: Temperature
+        max_tokens: Maximum tokens to generate
+        print_cost: Whether to print cost
+        cached_content: Name of a context cache holding system_prompt
+        stop_when: Stream and stop early once this returns True for the text so far
+        
+    Returns:
+        Generated response text
+    """
+    return await aquery_gemini(
+        model_str=model_str,
+        prompt=prompt,
+        system_prompt=system_prompt,
+        gemini_api_key=gemini_api_key,
+        tries=tries,
+        timeout=timeout,
+        temp=temp,
+        max_tokens=max_tokens,
+        print_cost=print_cost,
+        cached_content=cached_content,
+        stop_when=stop_when
+    )
+
+
+def create_gemini_cache(
+    model_str: str,
+    system_prompt: str,
+    gemini_api_key: Optional[str] = None,
+    ttl_seconds: int = 3600
+) -> Optional[str]:
+    """
+    Store a system prompt in a Gemini context cache for reuse across calls.
+    
+    Args:
+        model_str: Model name
+        system_prompt: System instructions to cache
+        gemini_api_key: API key
+        ttl_seconds: Cache lifetime in seconds
+        
+    Returns:
+        Cache name to pass as cached_content, or None if the prompt is below
+        the minimum cache size or the cache could not be created
+    """
+    if not is_cacheable_prompt(system_prompt):
+        return None
+    
+    if gemini_api_key is None:
+        gemini_api_key = os.getenv('GEMINI_API_KEY')
+    
+    if gemini_api_key is None:
+        raise ValueError("Gemini API key not provided. Set GEMINI_API_KEY environment variable or pass gemini_api_key parameter.")
+    
+    _ensure_configured(gemini_api_key)
+    gemini_model_name = MODEL_MAPPING.get(model_str, "gemini-2.0-flash-lite")
+    
+    try:
+        cache = genai.caching.CachedContent.create(
+            model=f"models/{gemini_model_name}",
+            system_instruction=system_prompt,
+            ttl=datetime.timedelta(seconds=ttl_seconds)
+        )
+    except Exception as e:
+        print(f"Gemini context cache not created: {str(e)}")
+        return None
+    
+    _CACHED_CONTENTS[cache.name] = cache
+    _CACHED_SYSTEM_PROMPTS[cache.name] = system_prompt
+    return cache.name
+
+
+def extract_json(text: str) -> Optional[Dict]:
+    """
+    Extract the first JSON object embedded in a model response.
+    
+    Args:
+        text: Model response text
+        
+    Returns:
+        Parsed JSON object, or None if no valid object is found
+    """
+    start = text.find("{")
+    while start != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, start)
+            if isinstance(obj, dict):
+                return obj
+        except ValueError:
+            pass
+        start = text.find("{", start + 1)
+    return None
+
+
+def json_object_complete(text: str) -> bool:
+    """
+    Check whether a (possibly partial) response already contains a full JSON object.
+    
+    Usable as a stop_when callback: the first object in the text must be
+    closed, so a nested object finishing early does not end the stream.
+    
+    Args:
+        text: Response text received so far
+        
+    Returns:
+        True once the first JSON object in text is closed and parses
+    """
+    start = text.find("{")
+    if start == -1:
+        return False
+    try:
+        _JSON_DECODER.raw_decode(text, start)
+    except ValueError:
+        return False
+    return True
+
+
 def get_token_usage() -> Dict[str, Dict[str, int]]:
     """
     Get current token usage statistics.
@@ -234,9 +841,8 @@ def get_token_usage() -> Dict[str, Dict[str, int]]:
 
 def reset_token_usage():
     """Reset token usage counters."""
-    global TOKENS_IN, TOKENS_OUT
-    TOKENS_IN = {}
-    TOKENS_OUT = {}
+    TOKENS_IN.clear()
+    TOKENS_OUT.clear()
 
 
 # Example usage
@@ -6,18 +6,260 @@ pull requests, and code reviews in the AI scientists simulation.
 """
 
 import os
+import json
+import base64
 import time
-from typing import Dict, List, Optional, Tuple
-from github import Github, Repository, PullRequest, GithubException
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from github import Github, Repository, PullRequest, GithubException, InputGitTreeElement
 from github.GithubException import UnknownObjectException
 
 
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+# PR metadata and changed file paths in one GraphQL request
+_PR_GRAPHQL_QUERY = """
+query($owner: String!, $name: String!, $number: Int!) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      number
+      title
+      body
+      state
+      headRefName
+      headRefOid
+      baseRefName
+      changedFiles
+      additions
+      deletions
+      files(first: 100) { nodes { path } }
+    }
+  }
+}
+"""
+
+# GraphQL returns at most this many changed files in one page
+GRAPHQL_MAX_FILES = 100
+
+# Repository node ID and the current head of a branch
+_REPO_REF_GRAPHQL_QUERY = """
+query($owner: String!, $name: String!, $ref: String!) {
+  repository(owner: $owner, name: $name) {
+    id
+    ref(qualifiedName: $ref) { target { oid } }
+  }
+}
+"""
+
+# Branch, commit and PR in one request (mutation fields run in order)
+_CREATE_PR_GRAPHQL_MUTATION = """
+mutation($repositoryId: ID!, $refName: String!, $oid: GitObjectID!,
+         $branch: CommittableBranch!, $message: CommitMessage!, $fileChanges: FileChanges!,
+         $baseRefName: String!, $headRefName: String!, $title: String!, $body: String) {
+  createRef(input: {repositoryId: $repositoryId, name: $refName, oid: $oid}) { ref { name } }
+  createCommitOnBranch(input: {branch: $branch, message: $message,
+                               fileChanges: $fileChanges, expectedHeadOid: $oid}) { commit { oid } }
+  createPullRequest(input: {repositoryId: $repositoryId, baseRefName: $baseRefName,
+                            headRefName: $headRefName, title: $title, body: $body}) {
+    pullRequest { number title body }
+  }
+}
+"""
+
+# Maximum number of PR files fetched concurrently
+MAX_FILE_FETCH_WORKERS = 8
+
+# HTTP connection pool size for the PyGithub session (concurrent file fetches
+# and PR workflows reuse kept-alive connections instead of re-handshaking)
+HTTP_POOL_SIZE = 32
+
+# Kept-alive connections in the session shared by GraphQL requests
+SHARED_HTTP_POOL_SIZE = 64
+
+# Page size for paginated listings (GitHub's maximum)
+PER_PAGE = 100
+
+# Authenticated REST budget per token (requests per hour)
+RATE_LIMIT_CAPACITY = 5000
+
+# Authenticated GraphQL budget per token (points per hour), tracked separately
+GRAPHQL_RATE_LIMIT_CAPACITY = 5000
+
+# Backoff delays (seconds) while waiting for a newly created repository
+REPO_READY_POLL_DELAYS = (0.1, 0.2, 0.4, 0.8, 1.6)
+
+# Polling for PR mergeability while GitHub computes it
+MERGEABLE_POLL_ATTEMPTS = 5
+MERGEABLE_POLL_INTERVAL = 0.5
+
+
+def _safe_get_content(repo: Repository.Repository, filename: str, ref: str) -> str:
+    """
+    Read a file from a branch, returning an error string instead of raising.
+    
+    Args:
+        repo: Repository object
+        filename: Path to the file in the repository
+        ref: Branch name
+        
+    Returns:
+        Decoded file content, or an error description
+    """
+    try:
+        content = repo.get_contents(filename, ref=ref)
+        return content.decoded_content.decode('utf-8')
+    except Exception as e:
+        return f"[Error reading file: {str(e)}]"
+
+
+def create_http_session(pool_size: int = SHARED_HTTP_POOL_SIZE) -> requests.Session:
+    """
+    Create an HTTP session with a connection pool sized for concurrent requests.
+    
+    One session can be shared by several GitHubManagers so that their
+    GraphQL requests reuse the same kept-alive TLS connections.
+    
+    Args:
+        pool_size: Maximum number of kept-alive connections per host
+        
+    Returns:
+        HTTP session (the caller is responsible for closing it)
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    return session
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket pacing requests to one of GitHub's hourly rate limits.
+    
+    The bucket refills continuously and is corrected from the rate-limit
+    headers GitHub returns, so requests made outside this process (or by
+    another manager using the same token) are accounted for as well.
+    """
+    
+    def __init__(self, capacity: int = RATE_LIMIT_CAPACITY,
+                 refill_per_sec: Optional[float] = None, resource: str = "core"):
+        """
+        Initialize the rate limiter with a full bucket.
+        
+        Args:
+            capacity: Maximum number of tokens (requests) in the bucket
+            refill_per_sec: Tokens added per second (defaults to capacity per hour)
+            resource: GitHub rate-limit resource the bucket tracks
+                ("core" for REST, "graphql" for GraphQL)
+        """
+        if refill_per_sec is None:
+            refill_per_sec = capacity / 3600
+        self.resource = resource
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float):
+        """Add the tokens accrued since the last update (lock must be held)."""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.refill_per_sec)
+        self._updated_at = now
+    
+    def acquire(self, tokens: int = 1):
+        """
+        Take tokens from the bucket, blocking until they are available.
+        
+        Args:
+            tokens: Number of requests about to be made
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = max(self._blocked_until - now,
+                           (tokens - self._tokens) / self.refill_per_sec)
+            time.sleep(wait)
+    
+    def update(self, remaining: Optional[int] = None, reset_at: Optional[float] = None,
+               retry_after: Optional[float] = None):
+        """
+        Correct the bucket from the server's view of the rate limit.
+        
+        Args:
+            remaining: Requests left in the current window
+            reset_at: Epoch seconds when the window resets
+            retry_after: Seconds the server asked us to wait
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if remaining is not None:
+                self._tokens = min(self._tokens, float(remaining))
+                if remaining <= 0 and reset_at is not None:
+                    self._blocked_until = max(self._blocked_until, now + reset_at - time.time())
+            if retry_after is not None:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+    
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """
+        Correct the bucket from a response's rate-limit headers.
+        
+        Remaining/reset are only applied when the response's resource matches
+        this bucket's (REST and GraphQL budgets are separate); Retry-After
+        always applies.
+        
+        Args:
+            headers: Response headers
+        """
+        retry_after = headers.get("Retry-After")
+        remaining = reset_at = None
+        if headers.get("X-RateLimit-Resource", "core") == self.resource:
+            if headers.get("X-RateLimit-Remaining") is not None:
+                remaining = int(headers["X-RateLimit-Remaining"])
+            if headers.get("X-RateLimit-Reset") is not None:
+                reset_at = float(headers["X-RateLimit-Reset"])
+        self.update(remaining, reset_at, float(retry_after) if retry_after is not None else None)
+
+
+# One limiter per (access token, resource), shared by all managers using that token
+_RATE_LIMITERS: Dict[Tuple[str, str], RateLimiter] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(access_token: str, resource: str = "core") -> RateLimiter:
+    """
+    Get the rate limiter for an access token and resource, creating it on first use.
+    
+    Args:
+        access_token: GitHub Personal Access Token
+        resource: "core" (REST) or "graphql"
+        
+    Returns:
+        Rate limiter shared by every manager using the token
+    """
+    key = (access_token, resource)
+    with _RATE_LIMITERS_LOCK:
+        if key not in _RATE_LIMITERS:
+            capacity = GRAPHQL_RATE_LIMIT_CAPACITY if resource == "graphql" else RATE_LIMIT_CAPACITY
+            _RATE_LIMITERS[key] = RateLimiter(capacity=capacity, resource=resource)
+        return _RATE_LIMITERS[key]
+
+
 class GitHubManager:
     """
     Manages GitHub repository operations including PR creation, review, and merging.
     """
     
-    def __init__(self, access_token: str, repo_owner: str, repo_name: str):
+    def __init__(self, access_token: str, repo_owner: str, repo_name: str,
+                 http_session: Optional[requests.Session] = None):
         """
         Initialize GitHub Manager.
         
@@ -25,15 +267,46 @@ class GitHubManager:
             access_token: GitHub Personal Access Token
             repo_owner: GitHub username or organization name
             repo_name: Repository name
+            http_session: Shared HTTP session for GraphQL requests (see
+                create_http_session); the caller closes it. A private
+                session is created if omitted.
         """
         from github import Auth
         auth = Auth.Token(access_token)
-        self.github = Github(auth=auth)
+        self._access_token = access_token
+        self._limiter = get_rate_limiter(access_token)
+        self._graphql_limiter = get_rate_limiter(access_token, "graphql")
+        self._owns_http = http_session is None
+        self._http = http_session if http_session is not None else create_http_session()
+        self.github = Github(auth=auth, per_page=PER_PAGE, pool_size=HTTP_POOL_SIZE)
         self.repo_owner = repo_owner
         self.repo_name = repo_name
         self.repo: Optional[Repository.Repository] = None
         self.user = self.github.get_user()
         
+    def close(self):
+        """Close the HTTP session if this manager created it."""
+        if self._owns_http:
+            self._http.close()
+    
+    def _acquire(self, requests_needed: int = 1):
+        """
+        Wait for rate-limit budget before making REST requests.
+        
+        The limiter is first corrected with the limit PyGithub's requester
+        recorded from the last response's headers. The requester's attributes
+        are read directly: Github.rate_limiting would call /rate_limit itself
+        before the first response has arrived.
+        
+        Args:
+            requests_needed: Number of requests about to be made
+        """
+        requester = self.github.requester
+        remaining, _ = requester.rate_limiting
+        if remaining >= 0:  # (-1, -1) until a response has been seen
+            self._limiter.update(remaining, requester.rate_limiting_resettime)
+        self._limiter.acquire(requests_needed)
+    
     def create_repository(self, description: str = "AI Scientists Research Simulation", 
                          private: bool = False) -> Repository.Repository:
         """
@@ -48,11 +321,13 @@ class GitHubManager:
         """
         try:
             # Check if repo already exists
+            self._acquire()
             self.repo = self.user.get_repo(self.repo_name)
             print(f"Repository {self.repo_name} already exists")
             return self.repo
         except UnknownObjectException:
             # Create new repository
+            self._acquire()
             self.repo = self.user.create_repo(
                 name=self.repo_name,
                 description=description,
@@ -60,7 +335,15 @@ class GitHubManager:
                 auto_init=True  # Initialize with README
             )
             print(f"Created repository: {self.repo.full_name}")
-            time.sleep(2)  # Wait for repo to be fully initialized
+            
+            # Wait until the initial commit is readable instead of sleeping a fixed time
+            for delay in REPO_READY_POLL_DELAYS:
+                try:
+                    self._acquire()
+                    self.repo.get_branch("main")
+                    break
+                except GithubException:
+                    time.sleep(delay)
             return self.repo
     
     def get_repository(self) -> Repository.Repository:
@@ -71,6 +354,7 @@ class GitHubManager:
             Repository object
         """
         if self.repo is None:
+            self._acquire()
             self.repo = self.github.get_repo(f"{self.repo_owner}/{self.repo_name}")
         return self.repo
     
@@ -89,23 +373,38 @@ class GitHubManager:
         
         repo = self.get_repository()
         
+        # Write all missing .gitkeep files in a single tree/commit instead of
+        # one create_file call (and one commit) per directory
+        self._acquire(3)
+        ref = repo.get_git_ref("heads/main")
+        base_commit = repo.get_git_commit(ref.object.sha)
+        existing = {
+            element.path for element in repo.get_git_tree(base_commit.tree.sha, recursive=True).tree
+        }
+        
+        missing = []
         for directory in directories:
-            try:
-                # Create .gitkeep file in each directory to preserve structure
-                file_path = f"{directory}/.gitkeep"
-                repo.create_file(
-                    path=file_path,
-                    message=f"Initialize {directory} directory",
-                    content="",
-                    branch="main"
-                )
-                print(f"Created directory: {directory}/")
-                time.sleep(1)  # Avoid rate limiting
-            except GithubException as e:
-                if e.status == 422:  # File already exists
-                    print(f"Directory {directory}/ already exists")
-                else:
-                    raise
+            if f"{directory}/.gitkeep" in existing:
+                print(f"Directory {directory}/ already exists")
+            else:
+                missing.append(directory)
+        
+        if not missing:
+            return
+        
+        tree_elements = [
+            InputGitTreeElement(path=f"{directory}/.gitkeep", mode="100644", type="blob", content="")
+            for directory in missing
+        ]
+        self._acquire(3)
+        new_tree = repo.create_git_tree(tree_elements, base_commit.tree)
+        commit = repo.create_git_commit(
+            f"Initialize directories: {', '.join(missing)}", new_tree, [base_commit]
+        )
+        ref.edit(commit.sha)
+        
+        for directory in missing:
+            print(f"Created directory: {directory}/")
     
     def create_branch(self, branch_name: str, source_branch: str = "main") -> str:
         """
@@ -122,9 +421,11 @@ class GitHubManager:
         
         try:
             # Get the source branch reference
+            self._acquire()
             source = repo.get_branch(source_branch)
             
             # Create new branch
+            self._acquire()
             repo.create_git_ref(
                 ref=f"refs/heads/{branch_name}",
                 sha=source.commit.sha
@@ -154,6 +455,7 @@ class GitHubManager:
             Commit information dictionary
         """
         repo = self.get_repository()
+        self._acquire(2 if update else 1)
         
         try:
             if update:
@@ -205,6 +507,7 @@ class GitHubManager:
         """
         repo = self.get_repository()
         
+        self._acquire()
         pr = repo.create_pull(
             title=title,
             body=body,
@@ -215,6 +518,104 @@ class GitHubManager:
         print(f"Created PR #{pr.number}: {title}")
         return pr
     
+    def create_pr_atomic(self, branch: str, base: str, file_path: str, content: str,
+                         title: str, body: str) -> Dict:
+        """
+        Create a branch, commit one file to it and open a PR with one GraphQL mutation.
+        
+        Only a lookup of the base branch head precedes the mutation. The
+        mutation's steps (createRef, createCommitOnBranch, createPullRequest)
+        run in order but are not atomic, so when it fails the steps that did
+        complete are kept and only the remaining ones are redone over REST.
+        If the mutation's outcome is unknown (no response), the new branch is
+        inspected to find out how far it got.
+        
+        Args:
+            branch: Name of the new branch
+            base: Branch to fork from and merge into
+            file_path: Path of the file in the repository
+            content: File content
+            title: PR title (also used as the commit message)
+            body: PR description/body
+            
+        Returns:
+            Dictionary with the PR number, title and body
+            
+        Raises:
+            Exception: If a REST step fails, or the branch state cannot be
+                determined after a failed mutation
+        """
+        completed = {}
+        try:
+            data = self._graphql(
+                _REPO_REF_GRAPHQL_QUERY,
+                {"owner": self.repo_owner, "name": self.repo_name, "ref": f"refs/heads/{base}"}
+            )["repository"]
+            base_oid = data["ref"]["target"]["oid"]
+        except Exception as e:
+            # Nothing has been created yet, so plain REST is safe
+            print(f"GraphQL PR creation failed, falling back to REST: {str(e)}")
+        else:
+            try:
+                completed = self._graphql(_CREATE_PR_GRAPHQL_MUTATION, {
+                    "repositoryId": data["id"],
+                    "refName": f"refs/heads/{branch}",
+                    "oid": base_oid,
+                    "branch": {
+                        "repositoryNameWithOwner": f"{self.repo_owner}/{self.repo_name}",
+                        "branchName": branch
+                    },
+                    "message": {"headline": title},
+                    "fileChanges": {"additions": [{
+                        "path": file_path,
+                        "contents": base64.b64encode(content.encode("utf-8")).decode("ascii")
+                    }]},
+                    "baseRefName": base,
+                    "headRefName": branch,
+                    "title": title,
+                    "body": body
+                }, partial=True)
+            except Exception as e:
+                print(f"GraphQL PR creation failed, checking branch {branch}: {str(e)}")
+                completed = self._completed_pr_steps(branch, base_oid)
+            
+            pr = (completed.get("createPullRequest") or {}).get("pullRequest")
+            if pr is not None:
+                print(f"Created PR #{pr['number']}: {title}")
+                return {"number": pr["number"], "title": pr["title"], "body": pr["body"]}
+            done = [step for step in ("createRef", "createCommitOnBranch") if completed.get(step)]
+            print(f"Resuming PR creation over REST (completed steps: {done or 'none'})")
+        
+        if not completed.get("createRef"):
+            self.create_branch(branch, base)
+        if not completed.get("createCommitOnBranch"):
+            self.commit_file(file_path, content, title, branch=branch, update=False)
+        pr = self.create_pull_request(title, body, branch, base)
+        return {"number": pr.number, "title": pr.title, "body": pr.body}
+    
+    def _completed_pr_steps(self, branch: str, base_oid: str) -> Dict:
+        """
+        Work out which create_pr_atomic steps ran when the mutation's response was lost.
+        
+        Args:
+            branch: Name of the new branch
+            base_oid: Commit the branch was created from
+            
+        Returns:
+            Mutation-shaped dictionary with createRef/createCommitOnBranch set
+            (truthy) for the steps that completed
+            
+        Raises:
+            Exception: If the branch cannot be looked up
+        """
+        ref = self._graphql(
+            _REPO_REF_GRAPHQL_QUERY,
+            {"owner": self.repo_owner, "name": self.repo_name, "ref": f"refs/heads/{branch}"}
+        )["repository"]["ref"]
+        if ref is None:
+            return {}
+        return {"createRef": True, "createCommitOnBranch": ref["target"]["oid"] != base_oid}
+    
     def get_pull_request(self, pr_number: int) -> PullRequest.PullRequest:
         """
         Get a pull request by number.
@@ -226,6 +627,7 @@ class GitHubManager:
             Pull request object
         """
         repo = self.get_repository()
+        self._acquire()
         return repo.get_pull(pr_number)
     
     def get_pr_files(self, pr_number: int) -> List[Dict]:
@@ -241,6 +643,7 @@ class GitHubManager:
         pr = self.get_pull_request(pr_number)
         files = []
         
+        self._acquire()
         for file in pr.get_files():
             files.append({
                 "filename": file.filename,
@@ -263,18 +666,24 @@ class GitHubManager:
         Returns:
             Dictionary with PR details and file contents
         """
+        try:
+            content = self._get_pr_content_graphql(pr_number)
+            if content is not None:
+                return content
+        except Exception as e:
+            print(f"GraphQL PR fetch failed, falling back to REST: {str(e)}")
+        
         repo = self.get_repository()
         pr = self.get_pull_request(pr_number)
         
-        # Get file contents
-        files_content = {}
-        for file in pr.get_files():
-            try:
-                # Get file content from the PR branch
-                content = repo.get_contents(file.filename, ref=pr.head.ref)
-                files_content[file.filename] = content.decoded_content.decode('utf-8')
-            except Exception as e:
-                files_content[file.filename] = f"[Error reading file: {str(e)}]"
+        # Get file contents from the PR branch (one request per file, run concurrently)
+        self._acquire()
+        filenames = [file.filename for file in pr.get_files()]
+        head_ref = pr.head.ref
+        self._acquire(len(filenames))
+        with ThreadPoolExecutor(max_workers=MAX_FILE_FETCH_WORKERS) as executor:
+            contents = executor.map(lambda filename: _safe_get_content(repo, filename, head_ref), filenames)
+            files_content = dict(zip(filenames, contents))
         
         return {
             "number": pr.number,
@@ -289,6 +698,95 @@ class GitHubManager:
             "deletions": pr.deletions
         }
     
+    def _graphql(self, query: str, variables: Optional[Dict] = None,
+                 partial: bool = False) -> Dict:
+        """
+        Run a GitHub GraphQL query.
+        
+        Args:
+            query: GraphQL query
+            variables: Query variables
+            partial: Return the data of a response with errors (failed fields
+                are null) instead of raising, as long as it has any
+            
+        Returns:
+            The response's data object
+            
+        Raises:
+            RuntimeError: If the response contains errors (and partial data
+                was not requested or is missing)
+        """
+        self._graphql_limiter.acquire()
+        response = self._http.post(
+            GITHUB_GRAPHQL_URL,
+            json={"query": query, "variables": variables or {}},
+            headers={"Authorization": f"bearer {self._access_token}"},
+            timeout=30
+        )
+        self._graphql_limiter.update_from_headers(response.headers)
+        response.raise_for_status()
+        result = response.json()
+        if result.get("errors"):
+            if partial and result.get("data") is not None:
+                print(f"GraphQL errors: {result['errors']}")
+                return result["data"]
+            raise RuntimeError(f"GraphQL errors: {result['errors']}")
+        return result["data"]
+    
+    def _get_pr_content_graphql(self, pr_number: int) -> Optional[Dict]:
+        """
+        Get PR details and all file contents in two GraphQL requests.
+        
+        Args:
+            pr_number: Pull request number
+            
+        Returns:
+            Same dictionary as get_pr_content, or None if the PR has more
+            changed files than fit in one GraphQL page
+        """
+        data = self._graphql(
+            _PR_GRAPHQL_QUERY,
+            {"owner": self.repo_owner, "name": self.repo_name, "number": pr_number}
+        )
+        pr = data["repository"]["pullRequest"]
+        if pr["changedFiles"] > GRAPHQL_MAX_FILES:
+            return None
+        
+        # All blobs at the head commit, aliased f0..fN in a single request
+        paths = [node["path"] for node in pr["files"]["nodes"]]
+        files_content = {}
+        if paths:
+            fields = "\n".join(
+                f"f{i}: object(expression: {json.dumps(pr['headRefOid'] + ':' + path)}) "
+                f"{{ ... on Blob {{ text isBinary }} }}"
+                for i, path in enumerate(paths)
+            )
+            blobs = self._graphql(
+                f"query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {fields} }} }}",
+                {"owner": self.repo_owner, "name": self.repo_name}
+            )["repository"]
+            for i, path in enumerate(paths):
+                blob = blobs.get(f"f{i}")
+                if blob is None:
+                    files_content[path] = "[Error reading file: not found on the PR branch]"
+                elif blob.get("isBinary") or blob.get("text") is None:
+                    files_content[path] = "[Error reading file: binary or too large]"
+                else:
+                    files_content[path] = blob["text"]
+        
+        return {
+            "number": pr["number"],
+            "title": pr["title"],
+            "body": pr["body"],
+            "state": "open" if pr["state"] == "OPEN" else "closed",
+            "head_branch": pr["headRefName"],
+            "base_branch": pr["baseRefName"],
+            "files": files_content,
+            "files_changed": pr["changedFiles"],
+            "additions": pr["additions"],
+            "deletions": pr["deletions"]
+        }
+    
     def create_review(self, pr_number: int, body: str, event: str = "COMMENT",
                      comments: Optional[List[Dict]] = None) -> Dict:
         """
@@ -311,6 +809,7 @@ class GitHubManager:
             raise ValueError(f"Invalid event type. Must be one of: {valid_events}")
         
         # Create review
+        self._acquire()
         review = pr.create_review(
             body=body,
             event=event,
@@ -364,6 +863,7 @@ class GitHubManager:
             Comment information dictionary
         """
         pr = self.get_pull_request(pr_number)
+        self._acquire()
         issue_comment = pr.create_issue_comment(comment)
         
         return {
@@ -372,29 +872,40 @@ class GitHubManager:
             "pr_number": pr_number
         }
     
-    def get_pr_reviews(self, pr_number: int) -> List[Dict]:
+    def iter_pr_reviews(self, pr_number: int, limit: Optional[int] = None) -> Iterator[Dict]:
         """
-        Get all reviews for a pull request.
+        Iterate over reviews for a pull request, fetching pages only as needed.
         
         Args:
             pr_number: Pull request number
+            limit: Maximum number of reviews to yield (None for all)
             
-        Returns:
-            List of review dictionaries
+        Yields:
+            Review dictionaries
         """
         pr = self.get_pull_request(pr_number)
-        reviews = []
         
-        for review in pr.get_reviews():
-            reviews.append({
+        self._acquire()
+        for review in itertools.islice(pr.get_reviews(), limit):
+            yield {
                 "id": review.id,
                 "user": review.user.login,
                 "body": review.body,
                 "state": review.state,
                 "submitted_at": review.submitted_at.isoformat() if review.submitted_at else None
-            })
+            }
+    
+    def get_pr_reviews(self, pr_number: int) -> List[Dict]:
+        """
+        Get all reviews for a pull request.
         
-        return reviews
+        Args:
+            pr_number: Pull request number
+            
+        Returns:
+            List of review dictionaries
+        """
+        return list(self.iter_pr_reviews(pr_number))
     
     def merge_pr(self, pr_number: int, commit_message: Optional[str] = None,
                 merge_method: str = "merge") -> Dict:
@@ -411,11 +922,20 @@ class GitHubManager:
         """
         pr = self.get_pull_request(pr_number)
         
+        # GitHub reports mergeable=None while it is still computing the status
+        for _ in range(MERGEABLE_POLL_ATTEMPTS):
+            if pr.mergeable is not None:
+                break
+            time.sleep(MERGEABLE_POLL_INTERVAL)
+            self._acquire()
+            pr.update()
+        
         # Check if PR is mergeable
         if not pr.mergeable:
             raise ValueError(f"PR #{pr_number} is not mergeable")
         
         # Merge the PR
+        self._acquire()
         result = pr.merge(
             commit_message=commit_message,
             merge_method=merge_method
@@ -436,6 +956,7 @@ class GitHubManager:
             pr_number: Pull request number
         """
         pr = self.get_pull_request(pr_number)
+        self._acquire()
         pr.edit(state="closed")
         print(f"Closed PR #{pr_number}")
     
@@ -453,26 +974,28 @@ class GitHubManager:
         repo = self.get_repository()
         
         try:
+            self._acquire()
             content = repo.get_contents(file_path, ref=branch)
             return content.decoded_content.decode('utf-8')
         except UnknownObjectException:
             raise FileNotFoundError(f"File {file_path} not found on branch {branch}")
     
-    def list_pull_requests(self, state: str = "open") -> List[Dict]:
+    def iter_pull_requests(self, state: str = "open", limit: Optional[int] = None) -> Iterator[Dict]:
         """
-        List pull requests in repository.
+        Iterate over pull requests in repository, fetching pages only as needed.
         
         Args:
             state: PR state - "open", "closed", or "all"
+            limit: Maximum number of PRs to yield (None for all)
             
-        Returns:
-            List of PR information dictionaries
+        Yields:
+            PR information dictionaries
         """
         repo = self.get_repository()
-        prs = []
         
-        for pr in repo.get_pulls(state=state):
-            prs.append({
+        self._acquire()
+        for pr in itertools.islice(repo.get_pulls(state=state), limit):
+            yield {
                 "number": pr.number,
                 "title": pr.title,
                 "state": pr.state,
@@ -480,9 +1003,19 @@ class GitHubManager:
                 "base_branch": pr.base.ref,
                 "created_at": pr.created_at.isoformat(),
                 "updated_at": pr.updated_at.isoformat()
-            })
+            }
+    
+    def list_pull_requests(self, state: str = "open") -> List[Dict]:
+        """
+        List pull requests in repository.
         
-        return prs
+        Args:
+            state: PR state - "open", "closed", or "all"
+            
+        Returns:
+            List of PR information dictionaries
+        """
+        return list(self.iter_pull_requests(state))
     
     def delete_branch(self, branch_name: str) -> None:
         """
@@ -492,6 +1025,7 @@ class GitHubManager:
             branch_name: Name of branch to delete
         """
         repo = self.get_repository()
+        self._acquire(2)
         ref = repo.get_git_ref(f"heads/{branch_name}")
         ref.delete()
         print(f"Deleted branch: {branch_name}")
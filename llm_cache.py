@@ -0,0 +1,113 @@
+"""
+LLM Response Cache Module
+
+This module provides an in-process cache for deterministic LLM requests
+(temperature 0 or unset), so that re-issuing an identical prompt returns
+the stored answer without an API call.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Optional fast JSON serializer for cache keys (falls back to the standard library)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+    def _dumps(obj) -> bytes:
+        """Serialize obj to canonical (key-sorted) JSON bytes."""
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+else:
+    def _dumps(obj) -> bytes:
+        """Serialize obj to canonical (key-sorted) JSON bytes."""
+        return json.dumps(obj, sort_keys=True, ensure_ascii=False).encode("utf-8")
+
+
+def cache_enabled() -> bool:
+    """Whether response caching is enabled (GEMINI_CACHE_ENABLED, default on)."""
+    return os.getenv("GEMINI_CACHE_ENABLED", "1").lower() not in ("0", "false", "no", "off")
+
+
+def make_cache_key(**fields) -> str:
+    """
+    Build a stable cache key from request fields.
+
+    Args:
+        **fields: Request fields (model, prompts, generation settings)
+
+    Returns:
+        SHA256 hex digest of the fields
+    """
+    return hashlib.sha256(_dumps(fields)).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Thread-safe LRU cache of LLM responses with an optional time-to-live.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the response cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            ttl_seconds: Seconds before an entry expires (None for no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key (see make_cache_key)
+
+        Returns:
+            Cached response, or None on a miss or if the entry expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str):
+        """
+        Store a response.
+
+        Args:
+            key: Cache key (see make_cache_key)
+            value: Response text
+        """
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached responses."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
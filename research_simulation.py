@@ -6,20 +6,55 @@ conduct research through GitHub PR/review process with initial citizen feedback.
 """
 
 import time
+import asyncio
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
-from github_manager import GitHubManager
-from ai_scientist_agents import AIScientistAgent
-from citizen_agents import create_citizen_agents
+from github_manager import GitHubManager, create_http_session
+from ai_scientist_agents import AIScientistAgent, run_theme_decision_parallel
+from citizen_agents import create_citizen_agents, evaluate_all_citizens, MAX_CONCURRENT_EVALUATIONS
+from citizen_cache import init_eval_cache
 from simulation_logger import SimulationLogger
 
 
+async def _run_all(*coros):
+    """
+    Run coroutines concurrently; the first failure cancels the others and is re-raised.
+    
+    Args:
+        *coros: Coroutines to run
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
 class ResearchSimulation:
     """
     Manages the research simulation workflow between two AI scientists.
     """
     
+    # Repository path of each stage's output ({sid}: scientist ID, {stage}: stage name)
+    _FILE_PATH_TEMPLATES = {
+        "theme_decision": "discussions/theme_{sid}.md",
+        "hypothesis": "hypotheses/hypothesis_{sid}.md",
+        "experiment_plan": "experiments/plan_{sid}.md",
+        "experiment_implementation": "experiments/code_{sid}.py",
+        "results_interpretation": "experiments/results_{sid}.md",
+        "paper_writing": "papers/draft_{sid}.md"
+    }
+    
+    # GitHub call posting each review decision (anything else is posted as a comment)
+    _REVIEW_DISPATCH = {
+        "APPROVE": GitHubManager.approve_pr,
+        "REQUEST_CHANGES": GitHubManager.reject_pr
+    }
+    
     def __init__(self, config: Dict):
         """
         Initialize research simulation.
@@ -29,19 +64,25 @@ class ResearchSimulation:
         """
         self.config = config
         
+        # One pooled HTTP session shared by both GitHub managers (closed when
+        # the simulation ends)
+        self._http = create_http_session()
+        
         # Initialize GitHub managers for each scientist
         # Scientist A's GitHub manager (for repository management and A's PRs)
         self.github_a = GitHubManager(
             access_token=config['github_token_a'],
             repo_owner=config['github_owner'],
-            repo_name=config['repo_name']
+            repo_name=config['repo_name'],
+            http_session=self._http
         )
         
         # Scientist B's GitHub manager (for B's PRs and reviews)
         self.github_b = GitHubManager(
             access_token=config['github_token_b'],
             repo_owner=config['github_owner'],
-            repo_name=config['repo_name']
+            repo_name=config['repo_name'],
+            http_session=self._http
         )
         
         # For backward compatibility, use github_a as default
@@ -50,7 +91,9 @@ class ResearchSimulation:
         # Initialize logger
         self.logger = SimulationLogger(
             log_dir=config.get('log_dir', './logs'),
-            console_output=config.get('console_output', True)
+            console_output=config.get('console_output', True),
+            keep_distribution=config.get('log_reward_distribution', True),
+            text_log=config.get('text_log', True)
         )
         
         # Initialize AI scientists
@@ -70,10 +113,17 @@ class ResearchSimulation:
             gemini_api_key=config['gemini_api_key']
         )
         
-        # Initialize citizens
+        # Initialize citizens (opt-in: evaluations of a theme that recurs within
+        # this run are served from a cache stored alongside the run's logs)
+        eval_cache = None
+        if config.get('citizen_cache', False):
+            eval_cache = init_eval_cache(
+                data_dir=config.get('citizen_cache_dir', str(self.logger.log_dir))
+            )
         self.citizens = create_citizen_agents(
             gemini_api_key=config['gemini_api_key'],
-            model=config.get('gemini_model', 'gemini-2.0-flash-lite')
+            model=config.get('gemini_model', 'gemini-2.0-flash-lite'),
+            eval_cache=eval_cache
         )
         
         # Research topic
@@ -96,6 +146,9 @@ class ResearchSimulation:
         
         self.scientist_a_stage = 0
         self.scientist_b_stage = 0
+        
+        # Serializes merges into main; bound to the event loop of each run
+        self._merge_lock: Optional[asyncio.Lock] = None
     
     def initialize(self):
         """Initialize the simulation: create repo and directory structure."""
@@ -131,67 +184,85 @@ class ResearchSimulation:
         print("\nRepository initialized successfully!")
         print("="*80 + "\n")
     
-    def phase_1_theme_decision(self):
-        """Phase 1: Both scientists decide their specific research themes."""
+    async def phase_1_theme_decision_async(self) -> Tuple[str, str]:
+        """Phase 1 with both scientists deciding their themes concurrently."""
         print("\n" + "="*80)
         print("PHASE 1: RESEARCH THEME DECISION")
         print("="*80)
         
-        # Scientist A decides theme
-        print(f"\nScientist A is deciding research theme...")
-        theme_a = self.scientist_a.decide_research_theme(self.general_topic)
+        print("\nScientists A and B are deciding research themes...")
+        theme_a, theme_b = await run_theme_decision_parallel(
+            self.scientist_a, self.scientist_b, self.general_topic
+        )
+        
+        # Log and print after both finish so the output does not interleave
         self.logger.log_research_theme_decision("A", theme_a, "Gemini-generated theme")
         print(f"Scientist A's theme: {theme_a}\n")
-        
-        # Scientist B decides theme
-        print(f"Scientist B is deciding research theme...")
-        theme_b = self.scientist_b.decide_research_theme(self.general_topic)
         self.logger.log_research_theme_decision("B", theme_b, "Gemini-generated theme")
         print(f"Scientist B's theme: {theme_b}\n")
         
         return theme_a, theme_b
     
-    def phase_2_citizen_evaluation(self, theme_a: str, theme_b: str):
-        """Phase 2: Citizens evaluate both themes and provide support."""
+    async def phase_2_citizen_evaluation_async(self, theme_a: str, theme_b: str):
+        """
+        Phase 2 with all citizen evaluations (both themes) issued concurrently.
+        
+        Concurrency is bounded by max_concurrent_evaluations. A failing
+        evaluation cancels the ones still pending (e.g., so an invalid API
+        key does not keep firing requests); completed evaluations are kept.
+        """
         print("\n" + "="*80)
         print("PHASE 2: CITIZEN EVALUATION")
         print("="*80)
         
         print("\nCitizens are evaluating the research themes...\n")
         
-        for citizen_name, citizen in self.citizens.items():
-            print(f"  {citizen_name} is evaluating...")
+        themes = {"A": theme_a, "B": theme_b}
+        scientist_ids = {f"研究者{scientist_id}": scientist_id for scientist_id in themes}
+        results = await evaluate_all_citizens(
+            self.citizens,
+            {name: themes[scientist_id] for name, scientist_id in scientist_ids.items()},
+            self.config.get('max_concurrent_evaluations', MAX_CONCURRENT_EVALUATIONS)
+        )
+        
+        # Record results in citizen order, A before B
+        rewards = {}
+        aborted = False
+        for (citizen_name, scientist_name), result in results.items():
+            scientist_id = scientist_ids[scientist_name]
+            if isinstance(result, BaseException):
+                aborted = True
+                self.logger.log_error(
+                    "CITIZEN_EVALUATION_ERROR",
+                    f"{citizen_name} failed to evaluate Scientist {scientist_id}'s theme: {str(result)}"
+                )
+                continue
             
-            # Evaluate Scientist A's theme
-            comment_a, reward_a, reasoning_a = citizen.evaluate_research_theme(
-                "研究者A", theme_a
-            )
-            self.scientist_a.add_citizen_feedback(
-                citizen_name, comment_a, reward_a, reasoning_a
-            )
+            comment, reward, reasoning = result
+            scientist = self.scientist_a if scientist_id == "A" else self.scientist_b
+            scientist.add_citizen_feedback(citizen_name, comment, reward, reasoning)
             self.logger.log_citizen_evaluation(
-                citizen_name, citizen.persona, "A", theme_a,
-                comment_a, reward_a, reasoning_a
+                citizen_name, self.citizens[citizen_name].persona, scientist_id,
+                themes[scientist_id], comment, reward, reasoning
             )
-            
-            # Evaluate Scientist B's theme
-            comment_b, reward_b, reasoning_b = citizen.evaluate_research_theme(
-                "研究者B", theme_b
-            )
-            self.scientist_b.add_citizen_feedback(
-                citizen_name, comment_b, reward_b, reasoning_b
-            )
-            self.logger.log_citizen_evaluation(
-                citizen_name, citizen.persona, "B", theme_b,
-                comment_b, reward_b, reasoning_b
+            rewards[(citizen_name, scientist_id)] = reward
+        
+        if aborted:
+            total = len(self.citizens) * len(themes)
+            self.logger.log_error(
+                "CITIZEN_EVALUATION_ABORTED",
+                f"{total - len(rewards)} of {total} citizen evaluations did not complete"
             )
-            
-            print(f"    Scientist A: {reward_a}円, Scientist B: {reward_b}円")
+        
+        for citizen_name in self.citizens:
+            print(f"  {citizen_name}: Scientist A: {rewards.get((citizen_name, 'A'), '-')}円, "
+                  f"Scientist B: {rewards.get((citizen_name, 'B'), '-')}円")
         
         print("\nCitizen evaluations completed!")
         print("="*80 + "\n")
     
-    def conduct_research_stage(self, scientist: AIScientistAgent, stage_idx: int) -> Tuple[str, str, str]:
+    async def conduct_research_stage_async(self, scientist: AIScientistAgent,
+                                           stage_idx: int) -> Tuple[str, str, str]:
         """
         Conduct a single research stage for a scientist.
         
@@ -206,32 +277,39 @@ class ResearchSimulation:
         scientist_id = scientist.scientist_id
         
         print(f"\nScientist {scientist_id} working on: {stage_name}")
-        self.logger.log_stage_start(scientist_id, stage_name, stage_idx)
-        
-        # Create stage output
-        output = scientist.create_stage_output(stage_name)
-        
-        # Determine file path based on stage
-        file_paths = {
-            "theme_decision": f"discussions/theme_{scientist_id}.md",
-            "hypothesis": f"hypotheses/hypothesis_{scientist_id}.md",
-            "experiment_plan": f"experiments/plan_{scientist_id}.md",
-            "experiment_implementation": f"experiments/code_{scientist_id}.py",
-            "results_interpretation": f"experiments/results_{scientist_id}.md",
-            "paper_writing": f"papers/draft_{scientist_id}.md"
-        }
-        
-        file_path = file_paths.get(stage_name, f"output_{scientist_id}_{stage_name}.md")
+        with self.logger.stage(scientist_id, stage_name, stage_idx) as run:
+            output = run.output = await scientist.create_stage_output_async(stage_name)
         
-        self.logger.log_stage_completion(scientist_id, stage_name, output)
+        file_path = self._stage_file_path(stage_name, scientist_id)
         
         return stage_name, output, file_path
     
-    def create_pr_for_stage(self, scientist: AIScientistAgent, stage_name: str, 
-                           output: str, file_path: str) -> int:
+    def _stage_file_path(self, stage_name: str, scientist_id: str) -> str:
+        """
+        Get the repository file path for a stage output.
+        
+        Args:
+            stage_name: Name of the stage
+            scientist_id: "A" or "B"
+            
+        Returns:
+            File path in the repository
+        """
+        template = self._FILE_PATH_TEMPLATES.get(stage_name, "output_{sid}_{stage}.md")
+        return template.format(sid=scientist_id, stage=stage_name)
+    
+    def _github_for(self, scientist_id: str) -> GitHubManager:
+        """Get the GitHub manager acting on behalf of a scientist."""
+        return self.github_a if scientist_id == "A" else self.github_b
+    
+    async def create_pr_for_stage_async(self, scientist: AIScientistAgent, stage_name: str,
+                                        output: str, file_path: str) -> int:
         """
         Create a GitHub PR for a research stage.
         
+        The GitHub request runs in a worker thread; logging stays on the
+        event loop.
+        
         Args:
             scientist: The scientist creating the PR
             stage_name: Name of the stage
@@ -243,46 +321,34 @@ class ResearchSimulation:
         """
         scientist_id = scientist.scientist_id
         branch_name = f"{scientist_id.lower()}-{stage_name}-{int(time.time())}"
+        github_manager = self._github_for(scientist_id)
         
-        # Select appropriate GitHub manager for this scientist
-        github_manager = self.github_a if scientist_id == "A" else self.github_b
-        
-        # Create branch
-        github_manager.create_branch(branch_name, "main")
-        self.logger.log_github_operation("create_branch", {"branch": branch_name})
-        
-        # Commit file
-        github_manager.commit_file(
+        pr = await asyncio.to_thread(
+            github_manager.create_pr_atomic,
+            branch=branch_name,
+            base="main",
             file_path=file_path,
             content=output,
-            commit_message=f"[Scientist {scientist_id}] {stage_name}",
-            branch=branch_name,
-            update=False
+            title=f"[Scientist {scientist_id}] {stage_name}",
+            body=f"Scientist {scientist_id}'s work on {stage_name}\n\n{output[:500]}..."
         )
+        self.logger.log_github_operation("create_branch", {"branch": branch_name})
         self.logger.log_github_operation(
             "commit_file",
             {"file": file_path, "branch": branch_name}
         )
         
-        # Create PR
-        pr = github_manager.create_pull_request(
-            title=f"[Scientist {scientist_id}] {stage_name}",
-            body=f"Scientist {scientist_id}'s work on {stage_name}\n\n{output[:500]}...",
-            head_branch=branch_name,
-            base_branch="main"
-        )
-        
         self.logger.log_pr_creation(
-            scientist_id, pr.number, pr.title, pr.body,
+            scientist_id, pr["number"], pr["title"], pr["body"],
             branch_name, [file_path]
         )
         
-        print(f"  Created PR #{pr.number}")
+        print(f"  Created PR #{pr['number']}")
         
-        return pr.number
+        return pr["number"]
     
-    def review_pr(self, reviewer: AIScientistAgent, pr_number: int,
-                 pr_author_id: str) -> Tuple[str, str]:
+    async def review_pr_async(self, reviewer: AIScientistAgent, pr_number: int,
+                              pr_author_id: str, stage_name: Optional[str] = None) -> Tuple[str, str]:
         """
         Have a scientist review a PR.
         
@@ -290,6 +356,7 @@ class ResearchSimulation:
             reviewer: The scientist doing the review
             pr_number: PR number to review
             pr_author_id: ID of the PR author ("A" or "B")
+            stage_name: Stage the PR belongs to
             
         Returns:
             Tuple of (review_type, comment)
@@ -298,22 +365,16 @@ class ResearchSimulation:
         
         print(f"\nScientist {reviewer_id} reviewing PR #{pr_number}...")
         
-        # Select appropriate GitHub manager for reviewer
-        reviewer_github = self.github_a if reviewer_id == "A" else self.github_b
+        reviewer_github = self._github_for(reviewer_id)
         
-        # Get PR content (can use any github manager for reading)
-        pr_content = self.github.get_pr_content(pr_number)
+        pr_content = await asyncio.to_thread(self.github.get_pr_content, pr_number)
         
-        # Get review decision
-        review_type, comment, reasoning = reviewer.review_pr(pr_content, pr_author_id)
+        review_type, comment, reasoning = await reviewer.review_pr_async(
+            pr_content, pr_author_id, stage_name
+        )
         
-        # Post review to GitHub using reviewer's account
-        if review_type == "APPROVE":
-            reviewer_github.approve_pr(pr_number, comment)
-        elif review_type == "REQUEST_CHANGES":
-            reviewer_github.reject_pr(pr_number, comment)
-        else:
-            reviewer_github.add_pr_comment(pr_number, comment)
+        post_review = self._REVIEW_DISPATCH.get(review_type, GitHubManager.add_pr_comment)
+        await asyncio.to_thread(post_review, reviewer_github, pr_number, comment)
         
         self.logger.log_pr_review(
             reviewer_id, pr_number, pr_author_id,
@@ -325,17 +386,56 @@ class ResearchSimulation:
         
         return review_type, comment
     
-    def run_simulation(self):
-        """Run the complete simulation."""
+    async def _run_turn(self, author_id: str):
+        """
+        Run one scientist's turn: stage output, PR, peer review, and merge or retry.
+        
+        Args:
+            author_id: ID of the scientist taking the turn ("A" or "B")
+        """
+        if author_id == "A":
+            author, reviewer = self.scientist_a, self.scientist_b
+        else:
+            author, reviewer = self.scientist_b, self.scientist_a
+        stage_attr = f"scientist_{author_id.lower()}_stage"
+        stage_idx = getattr(self, stage_attr)
+        
+        if stage_idx >= len(self.stages):
+            return
+        
+        stage_name, output, file_path = await self.conduct_research_stage_async(author, stage_idx)
+        pr_number = await self.create_pr_for_stage_async(author, stage_name, output, file_path)
+        
+        # The other scientist reviews
+        review_type, comment = await self.review_pr_async(reviewer, pr_number, author_id, stage_name)
+        
+        if review_type == "APPROVE":
+            # Merge PR (merges into main are serialized)
+            async with self._merge_lock:
+                await asyncio.to_thread(self.github.merge_pr, pr_number)
+            self.logger.log_pr_merge(pr_number, author_id)
+            author.add_pr_feedback(pr_number, "APPROVED", comment)
+            await author.update_cache_async(stage_name, output)
+            setattr(self, stage_attr, stage_idx + 1)
+            print(f"  Scientist {author_id} advances to stage {stage_idx + 1}")
+        else:
+            # Retry
+            author.add_pr_feedback(pr_number, "REJECTED", comment)
+            self.logger.log_stage_retry(author_id, stage_name, comment[:100])
+            print(f"  Scientist {author_id} must retry stage {stage_idx}")
+    
+    async def run_simulation_async(self):
+        """Run the complete simulation; both scientists take their turns concurrently."""
         try:
             # Initialize
             self.initialize()
+            self._merge_lock = asyncio.Lock()
             
             # Phase 1: Theme decision
-            theme_a, theme_b = self.phase_1_theme_decision()
+            theme_a, theme_b = await self.phase_1_theme_decision_async()
             
             # Phase 2: Citizen evaluation
-            self.phase_2_citizen_evaluation(theme_a, theme_b)
+            await self.phase_2_citizen_evaluation_async(theme_a, theme_b)
             
             # Main research loop
             print("\n" + "="*80)
@@ -353,59 +453,8 @@ class ResearchSimulation:
                     f"Scientist A stage {self.scientist_a_stage}, Scientist B stage {self.scientist_b_stage}"
                 )
                 
-                # Scientist A's turn
-                if self.scientist_a_stage < len(self.stages):
-                    stage_name, output, file_path = self.conduct_research_stage(
-                        self.scientist_a, self.scientist_a_stage
-                    )
-                    pr_number = self.create_pr_for_stage(
-                        self.scientist_a, stage_name, output, file_path
-                    )
-                    
-                    # Scientist B reviews
-                    review_type, comment = self.review_pr(
-                        self.scientist_b, pr_number, "A"
-                    )
-                    
-                    if review_type == "APPROVE":
-                        # Merge PR
-                        self.github.merge_pr(pr_number)
-                        self.logger.log_pr_merge(pr_number, "A")
-                        self.scientist_a.add_pr_feedback(pr_number, "APPROVED", comment)
-                        self.scientist_a_stage += 1
-                        print(f"  Scientist A advances to stage {self.scientist_a_stage}")
-                    else:
-                        # Retry
-                        self.scientist_a.add_pr_feedback(pr_number, "REJECTED", comment)
-                        self.logger.log_stage_retry("A", stage_name, comment[:100])
-                        print(f"  Scientist A must retry stage {self.scientist_a_stage}")
-                
-                # Scientist B's turn
-                if self.scientist_b_stage < len(self.stages):
-                    stage_name, output, file_path = self.conduct_research_stage(
-                        self.scientist_b, self.scientist_b_stage
-                    )
-                    pr_number = self.create_pr_for_stage(
-                        self.scientist_b, stage_name, output, file_path
-                    )
-                    
-                    # Scientist A reviews
-                    review_type, comment = self.review_pr(
-                        self.scientist_a, pr_number, "B"
-                    )
-                    
-                    if review_type == "APPROVE":
-                        # Merge PR
-                        self.github.merge_pr(pr_number)
-                        self.logger.log_pr_merge(pr_number, "B")
-                        self.scientist_b.add_pr_feedback(pr_number, "APPROVED", comment)
-                        self.scientist_b_stage += 1
-                        print(f"  Scientist B advances to stage {self.scientist_b_stage}")
-                    else:
-                        # Retry
-                        self.scientist_b.add_pr_feedback(pr_number, "REJECTED", comment)
-                        self.logger.log_stage_retry("B", stage_name, comment[:100])
-                        print(f"  Scientist B must retry stage {self.scientist_b_stage}")
+                # A and B work on independent branches and PRs
+                await _run_all(self._run_turn("A"), self._run_turn("B"))
                 
                 # Check completion
                 if (self.scientist_a_stage >= len(self.stages) and
@@ -415,9 +464,6 @@ class ResearchSimulation:
                     print("BOTH SCIENTISTS COMPLETED ALL STAGES!")
                     print("="*80)
                     break
-                
-                # Small delay to avoid rate limits
-                time.sleep(2)
             
             # Finalize
             self.logger.finalize()
@@ -430,6 +476,12 @@ class ResearchSimulation:
             self.logger.log_error("SIMULATION_ERROR", str(e))
             self.logger.finalize()
             raise
+        finally:
+            self._http.close()
+    
+    def run_simulation(self):
+        """Run the complete simulation."""
+        asyncio.run(self.run_simulation_async())
 
 
 # Example usage
@@ -10,6 +10,7 @@ This script runs the complete simulation with configuration from:
 
 import os
 import sys
+import asyncio
 import argparse
 import yaml
 from pathlib import Path
@@ -17,6 +18,12 @@ from dotenv import load_dotenv
 
 from research_simulation import ResearchSimulation
 
+# Use libyaml's C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 
 def load_config(config_path: str = "./config.yaml") -> dict:
     """
@@ -35,11 +42,56 @@ def load_config(config_path: str = "./config.yaml") -> dict:
         return {}
     
     with open(config_file, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=_YamlLoader)
     
     return config if config else {}
 
 
+# Merged config keys: (config key, path in config.yaml, default).
+# Each key is taken from args, then env, then config.yaml, then the default.
+_KEY_MAP = (
+    ('research_topic', ('research', 'topic'), '自然言語処理における感情分析'),
+    ('max_steps', ('research', 'max_steps'), 100),
+    ('repo_name', ('github', 'repo_name'), 'ai-scientists-research'),
+    ('github_owner', ('github', 'owner'), ''),
+    ('log_dir', ('logging', 'log_dir'), './logs'),
+    ('console_output', ('logging', 'console_output'), True),
+    ('text_log', ('logging', 'text_log'), True),
+    ('gemini_model', ('gemini', 'model'), 'gemini-2.0-flash-lite'),
+    ('temperature', ('gemini', 'temperature'), 0.7),
+    ('max_tokens', ('gemini', 'max_tokens'), 2048),
+)
+
+_MAPPED_KEYS = frozenset(key for key, _, _ in _KEY_MAP)
+
+
+def _yaml_value(yaml_config: dict, path: tuple):
+    """Look up a nested config.yaml value, or None if any part of the path is missing."""
+    value = yaml_config
+    for part in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def pick(*values, default=None):
+    """
+    Return the first value that is not None.
+    
+    Args:
+        *values: Candidate values in priority order
+        default: Value returned if all candidates are None
+        
+    Returns:
+        First non-None value, or default
+    """
+    for value in values:
+        if value is not None:
+            return value
+    return default
+
+
 def merge_configs(yaml_config: dict, env_config: dict, args_config: dict) -> dict:
     """
     Merge configurations with priority: args > env > yaml > defaults.
@@ -52,43 +104,22 @@ def merge_configs(yaml_config: dict, env_config: dict, args_config: dict) -> dic
     Returns:
         Merged configuration dictionary
     """
-    # Default configuration
-    config = {
-        'research_topic': '自然言語処理における感情分析',
-        'max_steps': 100,
-        'repo_name': 'ai-scientists-research',
-        'log_dir': './logs',
-        'console_output': True,
-        'gemini_model': 'gemini-2.0-flash-lite',
-        'temperature': 0.7,
-        'max_tokens': 2048,
-        'notes': []
-    }
-    
-    # Merge YAML config
-    if yaml_config:
-        if 'research' in yaml_config:
-            config['research_topic'] = yaml_config['research'].get('topic', config['research_topic'])
-            config['max_steps'] = yaml_config['research'].get('max_steps', config['max_steps'])
-        
-        if 'github' in yaml_config:
-            config['repo_name'] = yaml_config['github'].get('repo_name', config['repo_name'])
-            config['github_owner'] = yaml_config['github'].get('owner', env_config.get('github_owner', ''))
-        
-        if 'logging' in yaml_config:
-            config['log_dir'] = yaml_config['logging'].get('log_dir', config['log_dir'])
-            config['console_output'] = yaml_config['logging'].get('console_output', config['console_output'])
-        
-        if 'gemini' in yaml_config:
-            config['gemini_model'] = yaml_config['gemini'].get('model', config['gemini_model'])
-            config['temperature'] = yaml_config['gemini'].get('temperature', config['temperature'])
-            config['max_tokens'] = yaml_config['gemini'].get('max_tokens', config['max_tokens'])
-    
-    # Merge environment config
-    config.update({k: v for k, v in env_config.items() if v is not None})
-    
-    # Merge command-line args (highest priority)
-    config.update({k: v for k, v in args_config.items() if v is not None})
+    yaml_config = yaml_config or {}
+    config = {'notes': []}
+    
+    for key, path, default in _KEY_MAP:
+        config[key] = pick(
+            args_config.get(key),
+            env_config.get(key),
+            _yaml_value(yaml_config, path),
+            default=default
+        )
+    
+    # Keys that only come from env or args (API keys, tokens)
+    for source in (env_config, args_config):
+        config.update({
+            k: v for k, v in source.items() if v is not None and k not in _MAPPED_KEYS
+        })
     
     return config
 
@@ -288,7 +319,7 @@ def main():
     try:
         print("\nStarting simulation...")
         simulation = ResearchSimulation(config)
-        simulation.run_simulation()
+        asyncio.run(simulation.run_simulation_async())
         
         print("\n" + "="*80)
         print("✓ SIMULATION COMPLETED SUCCESSFULLY!")
@@ -5,12 +5,215 @@ This module provides comprehensive logging for the AI scientists simulation,
 recording all events, actions, reviews, and statistical information.
 """
 
+import io
 import json
 import os
+import sys
+import time
+import queue
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from pathlib import Path
 
+# Optional fast JSON serializer for the event stream (falls back to the standard library)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+@dataclass(slots=True)
+class Event:
+    """A single logged event (converted to a JSON object only when written)."""
+    timestamp: str
+    event_type: str
+    description: str
+    data: Dict
+
+
+@dataclass(slots=True)
+class StageRun:
+    """Handle yielded by SimulationLogger.stage; set output before the block ends."""
+    output: str = ""
+
+
+def _json_default(obj: Any):
+    """Serialize Event records as objects and anything else as its string form."""
+    if isinstance(obj, Event):
+        return {
+            "timestamp": obj.timestamp,
+            "event_type": obj.event_type,
+            "description": obj.description,
+            "data": obj.data
+        }
+    return str(obj)
+
+
+if ORJSON_AVAILABLE:
+    def _json_line(record: Any) -> bytes:
+        """Serialize a record (dict or Event) to one JSON line."""
+        return orjson.dumps(record, default=str, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+    
+    def _json_compact(data: Dict) -> str:
+        """Serialize data to compact single-line JSON text."""
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    
+    def _json_pretty(data: Dict) -> bytes:
+        """Serialize data to indented JSON bytes."""
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+else:
+    def _json_line(record: Any) -> bytes:
+        """Serialize a record (dict or Event) to one JSON line."""
+        return (json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=_json_default) + "\n").encode("utf-8")
+    
+    def _json_compact(data: Dict) -> str:
+        """Serialize data to compact single-line JSON text."""
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str)
+    
+    def _json_pretty(data: Dict) -> bytes:
+        """Serialize data to indented JSON bytes."""
+        return json.dumps(data, indent=2, ensure_ascii=False, default=str).encode("utf-8")
+
+
+# Buffer size of the text log file
+TEXT_LOG_BUFFER_SIZE = 1024 * 1024
+
+# Text log lines collected before they are handed to the file in one writelines call
+TEXT_LOG_BATCH_LINES = 64
+
+# Characters of each stage output kept in the logs
+STAGE_OUTPUT_LOG_CHARS = 500
+
+# Shared data for events without any (never mutated; only serialized)
+_EMPTY_DATA: Dict = {}
+
+# End-of-stream marker for AsyncLogSink's writer thread
+_STOP = object()
+
+# Seconds AsyncLogSink.flush waits between checks that the writer thread is alive
+SINK_LIVENESS_POLL = 0.5
+
+
+class AsyncLogSink:
+    """
+    Writes log records as JSON lines from a background thread.
+    
+    Callers only enqueue records; a daemon thread serializes them and writes
+    through a buffered file, flushing every `batch` records or `flush_ms`
+    milliseconds, so disk I/O stays off the simulation's hot path.
+    """
+    
+    def __init__(self, path: Path, batch: int = 64, flush_ms: int = 100):
+        """
+        Open the output file and start the writer thread.
+        
+        Args:
+            path: JSON Lines file to write (truncated if it exists)
+            batch: Flush after this many records
+            flush_ms: Flush at most this many milliseconds after a write
+        """
+        self.path = Path(path)
+        self.batch = batch
+        self.flush_interval = flush_ms / 1000
+        self._queue = queue.SimpleQueue()
+        self._file = io.BufferedWriter(io.FileIO(self.path, 'w'), buffer_size=64 * 1024)
+        self._closed = False
+        self._thread = threading.Thread(target=self._drain, name="AsyncLogSink", daemon=True)
+        self._thread.start()
+    
+    def put(self, record: Any):
+        """
+        Enqueue a record for writing.
+        
+        Args:
+            record: JSON-serializable record (dict or Event)
+        """
+        self._queue.put(record)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every record enqueued so far is written to the file.
+        
+        Args:
+            timeout: Maximum seconds to wait (None waits as long as the writer
+                thread is alive)
+            
+        Returns:
+            True if the records were flushed, False on timeout or if the
+            writer thread has stopped
+        """
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not done.wait(SINK_LIVENESS_POLL):
+            if not self._thread.is_alive():
+                print(f"Log writer thread stopped; {self.path} was not flushed")
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        return True
+    
+    def close(self):
+        """Write the remaining records, stop the writer thread, sync and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        os.fsync(self._file.fileno())
+        self._file.close()
+    
+    def _flush_file(self):
+        """Flush the file buffer, reporting (not raising) write errors."""
+        try:
+            self._file.flush()
+        except (OSError, ValueError) as e:
+            print(f"Error flushing {self.path}: {str(e)}")
+    
+    def _drain(self):
+        """
+        Writer thread: serialize and write queued records in batches.
+        
+        A record that fails to serialize or write is reported and skipped, so
+        one bad record never stops the thread (and never hangs flush()).
+        """
+        pending = 0
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval if pending else None)
+            except queue.Empty:
+                # Idle with unflushed records
+                self._flush_file()
+                pending, last_flush = 0, time.monotonic()
+                continue
+            
+            if item is _STOP:
+                self._flush_file()
+                return
+            if isinstance(item, threading.Event):
+                self._flush_file()
+                pending, last_flush = 0, time.monotonic()
+                item.set()
+                continue
+            
+            try:
+                self._file.write(_json_line(item))
+            except Exception as e:
+                print(f"Error writing log record to {self.path}: {str(e)}")
+                continue
+            pending += 1
+            if pending >= self.batch or time.monotonic() - last_flush >= self.flush_interval:
+                self._flush_file()
+                pending, last_flush = 0, time.monotonic()
+
 
 class SimulationLogger:
     """
@@ -18,22 +221,28 @@ class SimulationLogger:
     Logs all events, actions, reviews, and statistics in both JSON and text formats.
     """
     
-    def __init__(self, log_dir: str = "./logs", console_output: bool = True):
+    def __init__(self, log_dir: str = "./logs", console_output: bool = True,
+                 keep_distribution: bool = True, text_log: bool = True):
         """
         Initialize the simulation logger.
         
         Args:
             log_dir: Directory to store log files
             console_output: Whether to also print logs to console
+            keep_distribution: Whether to record every citizen reward in the
+                statistics (totals are tracked either way)
+            text_log: Whether to write the human-readable simulation_log.txt
+                (events.jsonl and simulation_log.json are always written)
         """
         self.log_dir = Path(log_dir)
         self.console_output = console_output
+        self.keep_distribution = keep_distribution
+        self.text_log = text_log
         
         # Create log directory if it doesn't exist
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
-        # Initialize log storage
-        self.events = []
+        # Initialize log storage (events are streamed to events.jsonl, not kept in memory)
         self.statistics = {
             "start_time": datetime.now().isoformat(),
             "end_time": None,
@@ -67,16 +276,50 @@ class SimulationLogger:
             "stage_durations": {}
         }
         
+        # Per-scientist statistics by scientist ID (either case)
+        self._sci = {
+            "A": self.statistics["scientist_a"],
+            "B": self.statistics["scientist_b"],
+            "a": self.statistics["scientist_a"],
+            "b": self.statistics["scientist_b"]
+        }
+        
+        # Running citizen reward totals (no pass over the distribution at finalize)
+        self._reward_sum = 0
+        self._reward_count = 0
+        
+        # (scientist, stage) -> (key of its open entry in stage_durations, monotonic start)
+        self._open_stages: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        
         # Log file paths
         self.json_log_path = self.log_dir / "simulation_log.json"
         self.text_log_path = self.log_dir / "simulation_log.txt"
-        
-        # Open text log file
-        self.text_log_file = open(self.text_log_path, 'w', encoding='utf-8')
+        self.events_log_path = self.log_dir / "events.jsonl"
+        
+        # Open text log file (large buffer; flushed on errors and at finalize
+        # rather than after every event)
+        self.text_log_file = None
+        if self.text_log:
+            self.text_log_file = open(self.text_log_path, 'w', encoding='utf-8', buffering=TEXT_LOG_BUFFER_SIZE)
+        self._text_batch: List[str] = []
+        self._text_batch_limit = TEXT_LOG_BATCH_LINES
+        
+        # Events are streamed as JSON lines by a background writer
+        self._event_sink = AsyncLogSink(self.events_log_path)
+        
+        # Console mirror runs on its own thread so a slow terminal never blocks logging
+        self._console_q = queue.SimpleQueue()
+        self._console_thread = None
+        if self.console_output:
+            self._console_thread = threading.Thread(
+                target=self._console_drain, name="SimulationLoggerConsole", daemon=True
+            )
+            self._console_thread.start()
         
         self._log_event("SIMULATION_START", "Simulation logger initialized")
     
-    def _log_event(self, event_type: str, description: str, data: Optional[Dict] = None):
+    def _log_event(self, event_type: str, description: str, data: Optional[Dict] = None,
+                   timestamp: Optional[str] = None):
         """
         Internal method to log an event.
         
@@ -84,25 +327,64 @@ class SimulationLogger:
             event_type: Type of event
             description: Human-readable description
             data: Additional event data
+            timestamp: ISO timestamp the caller already took (defaults to now)
         """
-        event = {
-            "timestamp": datetime.now().isoformat(),
-            "event_type": event_type,
-            "description": description,
-            "data": data or {}
-        }
-        self.events.append(event)
+        event = Event(
+            timestamp or datetime.now().isoformat(),
+            event_type,
+            description,
+            data if data else _EMPTY_DATA
+        )
+        self._event_sink.put(event)
+        
+        if not (self.text_log or self.console_output):
+            return
         
         # Write to text log
-        log_line = f"[{event['timestamp']}] {event_type}: {description}\n"
+        log_line = f"[{event.timestamp}] {event_type}: {description}\n"
         if data:
-            log_line += f"  Data: {json.dumps(data, indent=2, ensure_ascii=False)}\n"
+            log_line += f"  Data: {_json_compact(data)}\n"
         
-        self.text_log_file.write(log_line)
-        self.text_log_file.flush()
+        if self.text_log:
+            self._text_batch.append(log_line)
+            if len(self._text_batch) >= self._text_batch_limit:
+                self._write_text_batch()
         
         if self.console_output:
-            print(log_line.strip())
+            self._console_q.put(log_line)
+    
+    def _write_text_batch(self):
+        """Hand the pending text log lines to the file in a single call."""
+        if self._text_batch and self._text_log_open():
+            self.text_log_file.writelines(self._text_batch)
+        self._text_batch.clear()
+    
+    def _console_drain(self):
+        """Console thread: write queued log lines to stdout, batching whatever is pending."""
+        while True:
+            batch = [self._console_q.get()]
+            try:
+                while True:
+                    batch.append(self._console_q.get_nowait())
+            except queue.Empty:
+                pass
+            
+            lines = [line for line in batch if line is not _STOP]
+            sys.stdout.write("".join(lines))
+            sys.stdout.flush()
+            if len(lines) != len(batch):
+                return
+    
+    def _stop_console(self):
+        """Write the remaining console lines and stop the console thread."""
+        if self._console_thread is not None:
+            self._console_q.put(_STOP)
+            self._console_thread.join()
+            self._console_thread = None
+    
+    def _text_log_open(self) -> bool:
+        """Whether the text log file is enabled and still open."""
+        return self.text_log_file is not None and not self.text_log_file.closed
     
     def log_research_theme_decision(self, scientist_id: str, theme: str, 
                                    thought_process: str):
@@ -114,7 +396,7 @@ class SimulationLogger:
             theme: Specific research theme decided
             thought_process: The scientist's decision-making process
         """
-        self.statistics[f"scientist_{scientist_id.lower()}"]["theme"] = theme
+        self._sci[scientist_id]["theme"] = theme
         
         self._log_event(
             "RESEARCH_THEME_DECISION",
@@ -141,11 +423,14 @@ class SimulationLogger:
             reward_amount: Support amount (1-1000 yen)
             reasoning: Reason for the reward amount
         """
-        self.statistics["citizen_rewards"]["distribution"].append({
-            "citizen": citizen_name,
-            "scientist": scientist_id,
-            "amount": reward_amount
-        })
+        self._reward_sum += reward_amount
+        self._reward_count += 1
+        if self.keep_distribution:
+            self.statistics["citizen_rewards"]["distribution"].append({
+                "citizen": citizen_name,
+                "scientist": scientist_id,
+                "amount": reward_amount
+            })
         
         self._log_event(
             "CITIZEN_EVALUATION",
@@ -170,24 +455,17 @@ class SimulationLogger:
             stage_name: Name of the stage
             stage_number: Stage number (0-5)
         """
-        stage_key = f"{scientist_id}_{stage_name}_{datetime.now().isoformat()}"
+        start_time = datetime.now().isoformat()
+        stage_key = f"{scientist_id}_{stage_name}_{start_time}"
         self.statistics["stage_durations"][stage_key] = {
             "scientist": scientist_id,
             "stage": stage_name,
-            "start_time": datetime.now().isoformat(),
+            "start_time": start_time,
             "end_time": None,
             "duration_seconds": None
         }
-        
-        self._log_event(
-            "STAGE_START",
-            f"Scientist {scientist_id} started {stage_name}",
-            {
-                "scientist": scientist_id,
-                "stage": stage_name,
-                "stage_number": stage_number
-            }
-        )
+        self._open_stages[(scientist_id, stage_name)] = (stage_key, time.monotonic())
+        self._log_stage_start_event(scientist_id, stage_name, stage_number, start_time)
     
     def log_stage_completion(self, scientist_id: str, stage_name: str, 
                             output: str):
@@ -200,25 +478,78 @@ class SimulationLogger:
             output: Stage output/result
         """
         # Update stage duration
-        for stage_key in reversed(list(self.statistics["stage_durations"].keys())):
+        end_timestamp = datetime.now().isoformat()
+        open_stage = self._open_stages.pop((scientist_id, stage_name), None)
+        if open_stage is not None:
+            stage_key, t0 = open_stage
             stage_info = self.statistics["stage_durations"][stage_key]
-            if (stage_info["scientist"] == scientist_id and 
-                stage_info["stage"] == stage_name and 
-                stage_info["end_time"] is None):
-                start_time = datetime.fromisoformat(stage_info["start_time"])
-                end_time = datetime.now()
-                stage_info["end_time"] = end_time.isoformat()
-                stage_info["duration_seconds"] = (end_time - start_time).total_seconds()
-                break
+            stage_info["end_time"] = end_timestamp
+            stage_info["duration_seconds"] = time.monotonic() - t0
+        
+        self._log_stage_completion_event(scientist_id, stage_name, output, end_timestamp)
+    
+    @contextmanager
+    def stage(self, scientist_id: str, stage_name: str, stage_number: int) -> Iterator[StageRun]:
+        """
+        Log a research stage around a block, timing it with a monotonic clock.
         
+        Replaces a log_stage_start / log_stage_completion pair: the duration is
+        measured locally and one complete entry is added to stage_durations.
+        Nothing is recorded as completed if the block raises.
+        
+        Args:
+            scientist_id: "A" or "B"
+            stage_name: Name of the stage
+            stage_number: Stage number (0-5)
+            
+        Yields:
+            StageRun whose output the block sets to the stage output/result
+        """
+        start_time = datetime.now().isoformat()
+        self._log_stage_start_event(scientist_id, stage_name, stage_number, start_time)
+        
+        run = StageRun()
+        t0 = time.monotonic()
+        yield run
+        duration = time.monotonic() - t0
+        
+        end_time = datetime.now().isoformat()
+        self.statistics["stage_durations"][f"{scientist_id}_{stage_name}_{start_time}"] = {
+            "scientist": scientist_id,
+            "stage": stage_name,
+            "start_time": start_time,
+            "end_time": end_time,
+            "duration_seconds": duration
+        }
+        self._log_stage_completion_event(scientist_id, stage_name, run.output, end_time)
+    
+    def _log_stage_start_event(self, scientist_id: str, stage_name: str,
+                               stage_number: int, timestamp: str):
+        """Write the STAGE_START event."""
+        self._log_event(
+            "STAGE_START",
+            f"Scientist {scientist_id} started {stage_name}",
+            {
+                "scientist": scientist_id,
+                "stage": stage_name,
+                "stage_number": stage_number
+            },
+            timestamp=timestamp
+        )
+    
+    def _log_stage_completion_event(self, scientist_id: str, stage_name: str,
+                                    output: str, timestamp: str):
+        """Write the STAGE_COMPLETION event (output truncated to STAGE_OUTPUT_LOG_CHARS)."""
         self._log_event(
             "STAGE_COMPLETION",
             f"Scientist {scientist_id} completed {stage_name}",
             {
                 "scientist": scientist_id,
                 "stage": stage_name,
-                "output": output[:500] + "..." if len(output) > 500 else output
-            }
+                "output": output[:STAGE_OUTPUT_LOG_CHARS],
+                "truncated": len(output) > STAGE_OUTPUT_LOG_CHARS
+            },
+            timestamp=timestamp
         )
     
     def log_pr_creation(self, scientist_id: str, pr_number: int, title: str,
@@ -235,7 +566,7 @@ class SimulationLogger:
             files_changed: List of files changed
         """
         self.statistics["total_prs"] += 1
-        self.statistics[f"scientist_{scientist_id.lower()}"]["prs_created"] += 1
+        self._sci[scientist_id]["prs_created"] += 1
         
         self._log_event(
             "PR_CREATED",
@@ -265,14 +596,14 @@ class SimulationLogger:
             reasoning: Reasoning for the decision
             context_used: What context was used for the review
         """
-        self.statistics[f"scientist_{reviewer_id.lower()}"]["reviews_given"] += 1
+        self._sci[reviewer_id]["reviews_given"] += 1
         
         if review_type == "APPROVE":
             self.statistics["approved_prs"] += 1
-            self.statistics[f"scientist_{pr_author.lower()}"]["prs_approved"] += 1
+            self._sci[pr_author]["prs_approved"] += 1
         elif review_type == "REQUEST_CHANGES":
             self.statistics["rejected_prs"] += 1
-            self.statistics[f"scientist_{pr_author.lower()}"]["prs_rejected"] += 1
+            self._sci[pr_author]["prs_rejected"] += 1
         
         self._log_event(
             "PR_REVIEW",
@@ -284,7 +615,7 @@ class SimulationLogger:
                 "review_type": review_type,
                 "comment": comment,
                 "reasoning": reasoning,
-                "context_used": context_used or {}
+                "context_used": context_used if context_used else _EMPTY_DATA
             }
         )
     
@@ -314,7 +645,7 @@ class SimulationLogger:
             stage_name: Name of the stage being retried
             reason: Reason for retry
         """
-        self.statistics[f"scientist_{scientist_id.lower()}"]["retries"] += 1
+        self._sci[scientist_id]["retries"] += 1
         
         self._log_event(
             "STAGE_RETRY",
@@ -340,7 +671,7 @@ class SimulationLogger:
         self._log_event(
             "SIMULATION_STEP",
             f"Step {step_number}: {description}",
-            details or {}
+            details
         )
     
     def log_error(self, error_type: str, error_message: str, context: Optional[Dict] = None):
@@ -355,8 +686,14 @@ class SimulationLogger:
         self._log_event(
             "ERROR",
             f"{error_type}: {error_message}",
-            context or {}
+            context
         )
+        
+        # Errors may precede a crash, so make sure they reach the disk
+        self._write_text_batch()
+        if self._text_log_open():
+            self.text_log_file.flush()
+        self._event_sink.flush()
     
     def log_github_operation(self, operation: str, details: Dict):
         """
@@ -400,13 +737,17 @@ class SimulationLogger:
         """
         Finalize the simulation and write complete logs.
         """
+        self._write_text_batch()
+        if self._text_log_open():
+            self.text_log_file.flush()
         self.statistics["end_time"] = datetime.now().isoformat()
+        self._event_sink.close()
+        self._stop_console()
         
         # Calculate citizen rewards statistics
-        if self.statistics["citizen_rewards"]["distribution"]:
-            amounts = [r["amount"] for r in self.statistics["citizen_rewards"]["distribution"]]
-            self.statistics["citizen_rewards"]["total_amount"] = sum(amounts)
-            self.statistics["citizen_rewards"]["average_amount"] = sum(amounts) / len(amounts)
+        if self._reward_count:
+            self.statistics["citizen_rewards"]["total_amount"] = self._reward_sum
+            self.statistics["citizen_rewards"]["average_amount"] = self._reward_sum / self._reward_count
         
         # Calculate approval rate
         if self.statistics["total_prs"] > 0:
@@ -418,24 +759,27 @@ class SimulationLogger:
             )
         
         # Write statistics summary to text log before closing
-        if not self.text_log_file.closed:
+        if self._text_log_open():
             summary = "\n" + "="*80 + "\n"
             summary += "SIMULATION STATISTICS SUMMARY\n"
             summary += "="*80 + "\n"
-            summary += json.dumps(self.statistics, indent=2, ensure_ascii=False)
+            summary += _json_pretty(self.statistics).decode("utf-8")
             summary += "\n" + "="*80 + "\n"
             
             self.text_log_file.write(summary)
+            # The only fsync of the text log: durability is needed once, at the end
+            self.text_log_file.flush()
+            os.fsync(self.text_log_file.fileno())
             self.text_log_file.close()
         
-        # Write complete JSON log
+        # Write the statistics summary (events are already in events.jsonl)
         complete_log = {
             "statistics": self.statistics,
-            "events": self.events
+            "events_file": self.events_log_path.name
         }
         
-        with open(self.json_log_path, 'w', encoding='utf-8') as f:
-            json.dump(complete_log, f, indent=2, ensure_ascii=False)
+        with open(self.json_log_path, 'wb') as f:
+            f.write(_json_pretty(complete_log))
         
         if self.console_output:
             print("\n" + "="*80)
@@ -449,11 +793,14 @@ class SimulationLogger:
                 print(f"Approval Rate: {self.statistics['approval_rate']:.2%}")
             print(f"\nLogs saved to:")
             print(f"  JSON: {self.json_log_path}")
-            print(f"  Text: {self.text_log_path}")
+            if self.text_log:
+                print(f"  Text: {self.text_log_path}")
+            print(f"  Events: {self.events_log_path}")
             print("="*80)
     
     def __del__(self):
         """Cleanup: close text log file if still open."""
-        if hasattr(self, 'text_log_file') and not self.text_log_file.closed:
+        if getattr(self, 'text_log_file', None) is not None and not self.text_log_file.closed:
+            self._write_text_batch()
             self.text_log_file.close()
 
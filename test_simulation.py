@@ -3,12 +3,47 @@ Test Script for AI Scientists Simulation
 
 This script performs basic validation of all components without running
 the full simulation. Use this to verify your setup before running the full simulation.
+
+Module checks only locate the modules by default; run with --deep to actually
+import them (catches errors raised at import time).
 """
 
 import os
 import sys
+import itertools
+import importlib.util
 from pathlib import Path
 
+# Import modules instead of only locating them (python test_simulation.py --deep)
+DEEP_IMPORT_CHECK = "--deep" in sys.argv[1:]
+
+# Skip the slow API round trips (Gemini generation, GitHub rate limit) and only
+# check that clients can be set up (FAST_TESTS=1 python test_simulation.py)
+FAST_TESTS = os.getenv("FAST_TESTS", "").lower() in ("1", "true", "yes", "on")
+
+
+def _module_available(module_name: str) -> bool:
+    """
+    Check whether a module can be imported.
+    
+    Only locates the module unless DEEP_IMPORT_CHECK is set, in which case it
+    is imported and import errors propagate.
+    
+    Args:
+        module_name: Dotted module name
+        
+    Returns:
+        True if the module was found (or imported)
+    """
+    if DEEP_IMPORT_CHECK:
+        __import__(module_name)
+        return True
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except ImportError:
+        # A parent package is missing
+        return False
+
 
 def test_imports():
     """Test that all required modules can be imported."""
@@ -23,11 +58,16 @@ def test_imports():
         ('dotenv', 'python-dotenv'),
     ]
     
+    verb = "imported" if DEEP_IMPORT_CHECK else "found"
+    
     all_passed = True
     for module_name, package_name in modules:
         try:
-            __import__(module_name)
-            print(f"✓ {package_name} imported successfully")
+            if _module_available(module_name):
+                print(f"✓ {package_name} {verb} successfully")
+            else:
+                print(f"✗ {package_name} is not installed")
+                all_passed = False
         except ImportError as e:
             print(f"✗ Failed to import {package_name}: {e}")
             all_passed = False
@@ -45,8 +85,11 @@ def test_imports():
     
     for module_name in custom_modules:
         try:
-            __import__(module_name)
-            print(f"✓ {module_name}.py imported successfully")
+            if _module_available(module_name):
+                print(f"✓ {module_name}.py {verb} successfully")
+            else:
+                print(f"✗ {module_name}.py not found")
+                all_passed = False
         except Exception as e:
             print(f"✗ Failed to import {module_name}.py: {e}")
             all_passed = False
@@ -127,8 +170,12 @@ def test_gemini_api():
         import google.generativeai as genai
         genai.configure(api_key=api_key)
         
-        # Try a simple test
         model = genai.GenerativeModel('gemini-2.0-flash-lite')
+        if FAST_TESTS:
+            print("✓ Gemini client configured (generation skipped: FAST_TESTS)")
+            return True
+        
+        # Try a simple test
         response = model.generate_content("Say 'Hello' in one word")
         
         if response and hasattr(response, 'text'):
@@ -170,6 +217,10 @@ def test_github_api():
         print(f"  Name: {user.name}")
         print(f"  Public repos: {user.public_repos}")
         
+        if FAST_TESTS:
+            print("  API rate limit: (check skipped: FAST_TESTS)")
+            return True
+        
         # Check API rate limit (handle different PyGithub versions)
         try:
             rate_limit = github.get_rate_limit()
@@ -208,7 +259,7 @@ def test_citizen_agents():
         
         if len(citizens) == 10:
             print(f"✓ Created {len(citizens)} citizen agents")
-            for name, citizen in list(citizens.items())[:3]:
+            for name, citizen in itertools.islice(citizens.items(), 3):
                 print(f"  - {name}: {citizen.occupation}")
             print(f"  ... and {len(citizens) - 3} more")
             return True
@@ -299,6 +350,190 @@ def test_logger():
         return False
 
 
+def test_llm_cache():
+    """Test LLM response cache eviction and key stability."""
+    print("\n" + "="*80)
+    print("TEST 9: LLM Response Cache")
+    print("="*80)
+    
+    try:
+        import time
+        from llm_cache import LLMResponseCache, make_cache_key
+        
+        # Keys ignore field order and change with any field value
+        key = make_cache_key(model="m", prompt="p", temp=0)
+        if key != make_cache_key(temp=0, prompt="p", model="m"):
+            print("✗ Cache key depends on field order")
+            return False
+        if key == make_cache_key(model="m", prompt="p", temp=0.5):
+            print("✗ Cache key ignores a changed field")
+            return False
+        
+        # LRU: reading "a" makes "b" the oldest entry, so "b" is evicted
+        cache = LLMResponseCache(max_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        if cache.get("b") is not None or cache.get("a") != "1" or cache.get("c") != "3":
+            print("✗ LRU eviction removed the wrong entry")
+            return False
+        
+        # TTL: entries expire after ttl_seconds
+        cache = LLMResponseCache(max_entries=2, ttl_seconds=0.05)
+        cache.put("a", "1")
+        time.sleep(0.1)
+        if cache.get("a") is not None or len(cache) != 0:
+            print("✗ Expired entry was returned")
+            return False
+        
+        print("✓ Cache keys are stable; LRU and TTL eviction work")
+        return True
+        
+    except Exception as e:
+        print(f"✗ LLM cache test failed: {str(e)}")
+        return False
+
+
+def test_citizen_cache():
+    """Test citizen evaluation cache key isolation and persistence."""
+    print("\n" + "="*80)
+    print("TEST 10: Citizen Evaluation Cache")
+    print("="*80)
+    
+    try:
+        from citizen_cache import init_eval_cache
+        import tempfile
+        import shutil
+        
+        temp_dir = tempfile.mkdtemp()
+        
+        try:
+            cache = init_eval_cache(temp_dir)
+            value = ("comment", 500, "reason")
+            cache.put("Citizen", "Scientist A", "theme", value)
+            
+            # Another scientist, citizen or theme must not hit the entry
+            if (cache.get("Citizen", "Scientist B", "theme") is not None
+                    or cache.get("Other", "Scientist A", "theme") is not None
+                    or cache.get("Citizen", "Scientist A", "theme 2") is not None):
+                print("✗ Cache returned an entry for a different key")
+                return False
+            cache.close()
+            
+            # A new cache on the same directory reads the entry back from SQLite
+            cache = init_eval_cache(temp_dir)
+            if cache.get("Citizen", "Scientist A", "theme") != value:
+                print("✗ Cached evaluation was not persisted")
+                return False
+            cache.close()
+            
+            print("✓ Evaluations are keyed by citizen, scientist and theme, and persisted")
+            return True
+            
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            
+    except Exception as e:
+        print(f"✗ Citizen cache test failed: {str(e)}")
+        return False
+
+
+def test_async_log_sink():
+    """Test that the async log sink writes every record before flush/close return."""
+    print("\n" + "="*80)
+    print("TEST 11: Async Log Sink")
+    print("="*80)
+    
+    try:
+        import json
+        from simulation_logger import AsyncLogSink
+        import tempfile
+        import shutil
+        
+        temp_dir = tempfile.mkdtemp()
+        
+        try:
+            path = Path(temp_dir) / "events.jsonl"
+            sink = AsyncLogSink(path, batch=1000, flush_ms=60000)
+            
+            # flush() returns only after earlier records reach the file
+            for i in range(10):
+                sink.put({"i": i})
+            if not sink.flush(timeout=5) or len(path.read_text(encoding="utf-8").splitlines()) != 10:
+                print("✗ flush() returned before all records were written")
+                return False
+            
+            # A record that cannot be serialized is skipped without stopping the writer
+            sink.put({("tuple", "key"): 1})
+            for i in range(10, 20):
+                sink.put({"i": i})
+            sink.close()
+            
+            lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+            if [line["i"] for line in lines] != list(range(20)):
+                print(f"✗ Expected records 0-19 in order, got {len(lines)} records")
+                return False
+            
+            print("✓ Records are written in order by flush() and close()")
+            return True
+            
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            
+    except Exception as e:
+        print(f"✗ Async log sink test failed: {str(e)}")
+        return False
+
+
+def test_retry_attempts():
+    """Test that a failing Gemini query is tried exactly `tries` times."""
+    print("\n" + "="*80)
+    print("TEST 12: Gemini Retry Loop")
+    print("="*80)
+    
+    try:
+        import gemini_inference
+        
+        class _FailingModel:
+            def generate_content(self, *args, **kwargs):
+                calls.append(1)
+                raise RuntimeError("simulated server error")
+        
+        calls, sleeps = [], []
+        saved = (gemini_inference._ensure_configured, gemini_inference._get_model,
+                 gemini_inference.time.sleep)
+        gemini_inference._ensure_configured = lambda key: None
+        gemini_inference._get_model = lambda *args: _FailingModel()
+        gemini_inference.time.sleep = sleeps.append
+        
+        try:
+            try:
+                gemini_inference.query_gemini(
+                    "gemini", "prompt", "system", gemini_api_key="test",
+                    tries=3, timeout=0.01, temp=0.5, print_cost=False
+                )
+                print("✗ Query succeeded with a failing model")
+                return False
+            except RuntimeError:
+                pass
+        finally:
+            (gemini_inference._ensure_configured, gemini_inference._get_model,
+             gemini_inference.time.sleep) = saved
+        
+        # Every attempt but the last backs off before retrying
+        if len(calls) != 3 or len(sleeps) != 2:
+            print(f"✗ Expected 3 attempts and 2 backoffs, got {len(calls)} and {len(sleeps)}")
+            return False
+        
+        print("✓ Failing query made 3 attempts with 2 backoffs")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Retry loop test failed: {str(e)}")
+        return False
+
+
 def main():
     """Run all tests."""
     print("\n" + "="*80)
@@ -314,6 +549,10 @@ def main():
         ("Citizen Agents", test_citizen_agents),
         ("AI Scientists", test_ai_scientist_creation),
         ("Logger", test_logger),
+        ("LLM Cache", test_llm_cache),
+        ("Citizen Cache", test_citizen_cache),
+        ("Async Log Sink", test_async_log_sink),
+        ("Retry Loop", test_retry_attempts),
     ]
     
     results = {}